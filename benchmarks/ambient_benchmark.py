@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Ambient soundscape benchmark for Horror Story Video Generator
+Renders a long synthetic story against a generated sound library and reports CPU time
+
+Usage: python benchmarks/ambient_benchmark.py --minutes 30
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import subtitles
+from services.ambient import AmbientSoundDesigner, SOUND_CATEGORIES, SCENE_KEYWORDS
+
+def build_sound_library(library_path, source_rate=44100):
+    """Write a short noise burst for every category/type pair"""
+    for category, sound_types in SOUND_CATEGORIES.items():
+        for sound_type in sound_types:
+            duration = random.uniform(2.0, 12.0)
+            samples = (np.random.randn(int(duration * source_rate)) * 0.1).astype(np.float32)
+            sf.write(os.path.join(library_path, f"{category}_{sound_type}.wav"), samples, source_rate)
+
+def build_scenes(total_seconds, scene_seconds=8.0):
+    """Create scene descriptions with random keywords covering the story"""
+    vocabulary = [word for words in SCENE_KEYWORDS.values() for word in words]
+    scenes = []
+    position = 0.0
+    while position < total_seconds:
+        end = min(position + scene_seconds, total_seconds)
+        description = "The camera lingers as " + ' '.join(random.sample(vocabulary, 6))
+        scenes.append({
+            'start_time': subtitles.ms_to_timestamp(subtitles.seconds_to_ms(position)),
+            'end_time': subtitles.ms_to_timestamp(subtitles.seconds_to_ms(end)),
+            'description': description
+        })
+        position = end
+    return scenes
+
+def main():
+    """Run the benchmark and print timings"""
+    parser = argparse.ArgumentParser(description="Benchmark ambient soundscape rendering")
+    parser.add_argument("--minutes", type=float, default=30.0, help="Story length in minutes")
+    parser.add_argument("--sample-rate", type=int, default=24000, help="Mix sample rate")
+    args = parser.parse_args()
+
+    random.seed(0)
+    np.random.seed(0)
+    total_seconds = args.minutes * 60
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        library_path = os.path.join(temp_dir, "sound_effects")
+        os.makedirs(library_path)
+        build_sound_library(library_path)
+        scenes = build_scenes(total_seconds)
+
+        designer = AmbientSoundDesigner(library_path, sample_rate=args.sample_rate, seed=0)
+        output_path = os.path.join(temp_dir, "ambient.wav")
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        designer.create_ambient_mix(scenes, output_path, total_seconds)
+        cpu_time = time.process_time() - cpu_start
+        wall_time = time.perf_counter() - wall_start
+
+        print(f"Scenes: {len(scenes)}")
+        print(f"Story length: {args.minutes:.1f} min at {args.sample_rate} Hz")
+        print(f"Render wall time: {wall_time:.2f} s, CPU time: {cpu_time:.2f} s")
+        print(f"Output size: {os.path.getsize(output_path) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
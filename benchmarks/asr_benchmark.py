@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Speech recognition benchmark for Horror Story Video Generator
+Compares the real-time factor (processing time / audio duration) of each ASR backend
+
+Usage: python benchmarks/asr_benchmark.py output/audio/narration.wav --models tiny base
+"""
+
+import os
+import sys
+import time
+import argparse
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.speech_recognition import ASR_BACKENDS, create_asr_backend
+
+def benchmark_backend(backend_name, model_size, audio_path, audio_duration):
+    """Benchmark a single backend/model combination"""
+    backend = create_asr_backend(backend_name, model_size)
+
+    start = time.perf_counter()
+    backend.load()
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    audio = backend.load_audio(audio_path)
+    segments = backend.transcribe(audio)
+    transcribe_time = time.perf_counter() - start
+
+    return {
+        'backend': backend_name,
+        'model': model_size,
+        'load_time': load_time,
+        'transcribe_time': transcribe_time,
+        'rtf': transcribe_time / audio_duration,
+        'segments': len(segments)
+    }
+
+def main():
+    """Run the benchmark and print a comparison table"""
+    parser = argparse.ArgumentParser(description="Compare ASR backend real-time factors")
+    parser.add_argument("audio_path", help="Narration audio file to transcribe")
+    parser.add_argument("--backends", nargs="+", default=list(ASR_BACKENDS), help="Backends to compare")
+    parser.add_argument("--models", nargs="+", default=["base"], help="Model sizes to compare")
+    args = parser.parse_args()
+
+    audio_duration = sf.info(args.audio_path).duration
+    print(f"Audio duration: {audio_duration:.2f} seconds")
+
+    results = []
+    for backend_name in args.backends:
+        for model_size in args.models:
+            try:
+                print(f"Benchmarking {backend_name} ({model_size})...")
+                results.append(benchmark_backend(backend_name, model_size, args.audio_path, audio_duration))
+            except ImportError as e:
+                print(f"Skipping {backend_name}: {str(e)}")
+
+    print(f"\n{'Backend':<16}{'Model':<10}{'Load (s)':>10}{'Transcribe (s)':>16}{'RTF':>8}{'Segments':>10}")
+    for result in results:
+        print(f"{result['backend']:<16}{result['model']:<10}{result['load_time']:>10.2f}"
+              f"{result['transcribe_time']:>16.2f}{result['rtf']:>8.3f}{result['segments']:>10}")
+
+if __name__ == "__main__":
+    main()
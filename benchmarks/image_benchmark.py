@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Image generation benchmark for Horror Story Video Generator
+Compares seconds per image of each sampling mode on this host, and the cost of
+upscaling the result once to cover the 1920x1080 render
+
+Usage: python benchmarks/image_benchmark.py --modes quality fast turbo --images 3
+       python benchmarks/image_benchmark.py --width 768 --height 512  (low-res generation)
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from services.image_service import GENERATION_MODES, ImageService
+from services.upscaler import RENDER_SIZE, upscale_to_cover
+
+PROMPTS = [
+    "abandoned farmhouse at dusk, broken windows, fog rolling over a dead cornfield",
+    "dim hospital corridor, flickering fluorescent light, wheelchair left in the hall",
+    "silhouette of a tall figure standing at the edge of a pine forest at night"
+]
+
+def benchmark_mode(mode, image_count, width, height):
+    """Benchmark a single sampling mode"""
+    service = ImageService(mode=mode)
+
+    start = time.perf_counter()
+    if not service.initialize_stable_diffusion():
+        raise ImportError(f"pipeline for '{mode}' could not be loaded")
+    load_time = time.perf_counter() - start
+
+    # Warm-up image is not timed
+    service.generate_image(PROMPTS[0], width, height)
+
+    generate_time = upscale_time = 0.0
+    for i in range(image_count):
+        start = time.perf_counter()
+        image, _ = service.generate_image(PROMPTS[i % len(PROMPTS)], width, height)
+        if image is None:
+            raise RuntimeError(f"'{mode}' failed to generate an image")
+        generated = time.perf_counter()
+        upscale_to_cover(image, RENDER_SIZE)
+        generate_time += generated - start
+        upscale_time += time.perf_counter() - generated
+
+    return {
+        'mode': mode,
+        'steps': service.settings['steps'],
+        'guidance': service.settings['guidance'],
+        'load_time': load_time,
+        'seconds_per_image': generate_time / image_count,
+        'upscale_seconds': upscale_time / image_count
+    }
+
+def main():
+    """Run the benchmark and print a comparison table"""
+    parser = argparse.ArgumentParser(description="Compare seconds per image of each sampling mode")
+    parser.add_argument("--modes", nargs="+", default=list(GENERATION_MODES), help="Modes to compare")
+    parser.add_argument("--images", type=int, default=3, help="Timed images per mode")
+    parser.add_argument("--width", type=int, default=1024, help="Image width")
+    parser.add_argument("--height", type=int, default=680, help="Image height")
+    args = parser.parse_args()
+
+    print(f"Device: {'cuda' if torch.cuda.is_available() else 'cpu'}, {args.width}x{args.height}")
+
+    results = []
+    for mode in args.modes:
+        try:
+            print(f"Benchmarking {mode}...")
+            results.append(benchmark_mode(mode, args.images, args.width, args.height))
+        except (ImportError, RuntimeError) as e:
+            print(f"Skipping {mode}: {str(e)}")
+
+    print(f"\n{'Mode':<10}{'Steps':>7}{'CFG':>6}{'Load (s)':>10}{'s/image':>10}{'Upscale (s)':>13}")
+    for result in results:
+        print(f"{result['mode']:<10}{result['steps']:>7}{result['guidance']:>6.1f}"
+              f"{result['load_time']:>10.2f}{result['seconds_per_image']:>10.2f}{result['upscale_seconds']:>13.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Subtitle I/O benchmark for Horror Story Video Generator
+Times parsing and writing of large SRT and WebVTT files with services.subtitles
+
+Usage: python benchmarks/subtitle_benchmark.py --cues 5000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import subtitles
+
+def make_cues(count):
+    """Create synthetic cues with narration-like timing and text"""
+    words = ["the", "door", "creaked", "open", "and", "something", "breathed", "in", "the", "dark"]
+    cues = []
+    position = 0
+    for _ in range(count):
+        duration = random.randint(1500, 6000)
+        text = ' '.join(random.choice(words) for _ in range(random.randint(6, 14)))
+        cues.append(subtitles.Cue(position, position + duration, text))
+        position += duration + random.randint(0, 400)
+    return cues
+
+def time_call(function, repeats):
+    """Return the best wall time of several runs in milliseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main():
+    """Run the benchmark and print timings"""
+    parser = argparse.ArgumentParser(description="Benchmark subtitle parsing and writing")
+    parser.add_argument("--cues", type=int, nargs="+", default=[1000, 5000, 20000], help="Cue counts to test")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'Cues':>8}{'Write SRT (ms)':>16}{'Parse SRT (ms)':>16}{'Write VTT (ms)':>16}{'Parse VTT (ms)':>16}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for count in args.cues:
+            cues = make_cues(count)
+            srt_path = os.path.join(temp_dir, "bench.srt")
+            vtt_path = os.path.join(temp_dir, "bench.vtt")
+
+            write_srt = time_call(lambda: subtitles.save_subtitles(cues, srt_path), args.repeats)
+            parse_srt = time_call(lambda: subtitles.read_subtitles(srt_path), args.repeats)
+            write_vtt = time_call(lambda: subtitles.save_subtitles(cues, vtt_path), args.repeats)
+            parse_vtt = time_call(lambda: subtitles.read_subtitles(vtt_path), args.repeats)
+
+            # Round trip must be lossless
+            assert subtitles.read_subtitles(srt_path) == cues
+            assert subtitles.read_subtitles(vtt_path) == cues
+
+            print(f"{count:>8}{write_srt:>16.2f}{parse_srt:>16.2f}{write_vtt:>16.2f}{parse_vtt:>16.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ from services.ai_service import AIService
 from services.audio_service import AudioService
 from services.image_service import ImageService
 from services.video_service import VideoService
+from services.encoding_service import EncodingService
 
 # Import credentials
 try:
@@ -70,6 +71,7 @@ class HorrorStoryApp(QMainWindow):
         self.audio_service = AudioService()
         self.image_service = ImageService()
         self.video_service = VideoService()
+        self.encoding_service = EncodingService()
         
     def init_ui(self):
         """Initialize the UI components"""
@@ -122,6 +124,7 @@ class HorrorStoryApp(QMainWindow):
             'story_data': None,
             'audio_path': None,
             'subtitles_path': None,
+            'timeline': None,
             'scene_descriptions': None,
             'image_prompts': None,
             'image_paths': None,
@@ -138,6 +141,12 @@ class HorrorStoryApp(QMainWindow):
         """Save the current project"""
         # TODO: Implement project saving
         pass
+    
+    def closeEvent(self, event):
+        """Stop background encoders and image workers before the window closes"""
+        self.encoding_service.close(wait=False)
+        self.image_service.close()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
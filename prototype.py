@@ -338,58 +338,24 @@ def generate_subtitles(audio_path, output_dir="subtitles"):
 srt_path = generate_subtitles(audio_path)
 
 # ===== CELL 9.1: ENHANCED SCENE DESCRIPTION GENERATION =====
+from services import subtitles
+from services.scene_planner import ScenePlanner
+
 def parse_srt_timestamps(srt_path):
     """Parse SRT file and extract timestamps with text"""
-    segments = []
-    current_segment = {}
-    
-    with open(srt_path, 'r', encoding='utf-8') as file:
-        lines = file.readlines()
-        
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        if line.isdigit():  # Segment number
-            if current_segment:
-                segments.append(current_segment)
-                current_segment = {}
-            
-            i += 1
-            # Parse timestamp line
-            timestamp_line = lines[i].strip()
-            start_time, end_time = timestamp_line.split(' --> ')
-            
-            i += 1
-            # Get text (may be multiple lines)
-            text = []
-            while i < len(lines) and lines[i].strip():
-                text.append(lines[i].strip())
-                i += 1
-                
-            current_segment = {
-                'start_time': start_time,
-                'end_time': end_time,
-                'text': ' '.join(text)
-            }
-        i += 1
-        
-    if current_segment:
-        segments.append(current_segment)
-        
-    return segments
+    return subtitles.cues_to_segments(subtitles.read_subtitles(srt_path))
 
-def generate_scene_descriptions(srt_path, delay_seconds=2):
+def generate_scene_descriptions(srt_path, delay_seconds=2, images_per_minute=None):
     """Generate cinematic scene descriptions based on subtitle segments"""
     segments = parse_srt_timestamps(srt_path)
     scene_descriptions = []
     
-    chunk_size = 2
+    # Group segments into shots of ~8 seconds, optionally capped by an image budget
+    shots = ScenePlanner(images_per_minute=images_per_minute).plan_segments(segments)
     max_retries = 3
     
-    for i in range(0, len(segments) - chunk_size + 1, chunk_size):
-        chunk = segments[i:i + chunk_size]
-        combined_text = ' '.join([seg['text'] for seg in chunk])
+    for shot in shots:
+        combined_text = shot['text']
         
         # Enhanced prompt focusing on visual storytelling and scenario creation
         prompt = f"""
@@ -431,12 +397,12 @@ def generate_scene_descriptions(srt_path, delay_seconds=2):
                     .strip())
                 
                 scene_descriptions.append({
-                    'start_time': chunk[0]['start_time'],
-                    'end_time': chunk[-1]['end_time'],
+                    'start_time': shot['start_time'],
+                    'end_time': shot['end_time'],
                     'description': cleaned_response
                 })
                 
-                print(f"Generated scene {len(scene_descriptions)}/{(len(segments) - chunk_size + 1)//chunk_size + 1}")
+                print(f"Generated scene {len(scene_descriptions)}/{len(shots)}")
                 time.sleep(delay_seconds)
                 break
                 
@@ -450,8 +416,8 @@ def generate_scene_descriptions(srt_path, delay_seconds=2):
                         print(f"Failed after {max_retries} attempts, using fallback description")
                         fallback_desc = "A dimly lit room with shadows stretching across the walls. A figure stands motionless, their face obscured by darkness as moonlight filters through a nearby window."
                         scene_descriptions.append({
-                            'start_time': chunk[0]['start_time'],
-                            'end_time': chunk[-1]['end_time'],
+                            'start_time': shot['start_time'],
+                            'end_time': shot['end_time'],
                             'description': fallback_desc
                         })
                 else:
@@ -570,6 +536,13 @@ def initialize_stable_diffusion():
     print("Stable Diffusion XL pipeline initialized successfully")
     return sd_pipeline
 
+def release_stable_diffusion():
+    """Free the Stable Diffusion XL pipeline and its GPU memory"""
+    global sd_pipeline
+    sd_pipeline = None
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
 initialize_stable_diffusion()
 
 # ===== CELL 12: ENHANCED STABLE DIFFUSION IMAGE GENERATION =====
@@ -579,8 +552,9 @@ import torch
 import os
 import time
 import random
+from services.upscaler import LOW_RES_SIZE, RENDER_SIZE, upscale_files
 
-def auto_generate_image(prompt):
+def auto_generate_image(prompt, width=1024, height=680):
     """Generate high-quality cinematic image with optimized SDXL settings"""
     global sd_pipeline
 
@@ -609,8 +583,7 @@ def auto_generate_image(prompt):
     seed = random.randint(1, 2147483647)
     torch_generator = torch.Generator(device="cuda").manual_seed(seed)
     
-    # Aspect ratios optimized for SDXL (using 3:2 for cinematic look)
-    width, height = 1024, 680  # 3:2 aspect ratio, optimized for SDXL
+    # Aspect ratios optimized for SDXL (using 3:2 for cinematic look): 1024x680 by default
     
     # Optimal inference parameters based on SDXL guide
     image = sd_pipeline(
@@ -627,8 +600,12 @@ def auto_generate_image(prompt):
     print(f"Image generated with seed: {seed}")
     return image
 
-def generate_story_images(image_prompts=None, output_dir="auto_images"):
-    """Generate high-quality images from prompts with advanced settings"""
+def generate_story_images(image_prompts=None, output_dir="auto_images", low_res=False):
+    """Generate high-quality images from prompts with advanced settings
+
+    With low_res set, images are generated at LOW_RES_SIZE and upscaled once to cover
+    the 1920x1080 render; the upscaled copies in output_dir/render are returned.
+    """
     # Check if image_prompts is provided, if not, try to use the global variable
     if image_prompts is None:
         # Try to access the global variable if it exists
@@ -648,7 +625,9 @@ def generate_story_images(image_prompts=None, output_dir="auto_images"):
 
     # Generate images with progress bar
     image_paths = []
-    print(f"\nGenerating {len(image_prompts)} cinematic images...")
+    width, height = LOW_RES_SIZE if low_res else (1024, 680)
+    print(f"\nGenerating {len(image_prompts)} cinematic images at {width}x{height}...")
+    generation_start = time.time()
     
     for idx, prompt_data in enumerate(image_prompts, 1):
         output_path = os.path.join(output_dir, f"scene_{idx:03d}.png")
@@ -669,7 +648,7 @@ def generate_story_images(image_prompts=None, output_dir="auto_images"):
                 )
                 
                 # Generate the image
-                image = auto_generate_image(cinematic_prompt)
+                image = auto_generate_image(cinematic_prompt, width, height)
                 
                 # Save in high quality
                 image.save(output_path, format="PNG", quality=100)
@@ -684,7 +663,13 @@ def generate_story_images(image_prompts=None, output_dir="auto_images"):
                     print(f"Attempt {attempt + 1} failed, retrying...")
                     time.sleep(2)
     
-    print(f"\nSuccessfully generated {len(image_paths)} cinematic images")
+    print(f"\nSuccessfully generated {len(image_paths)} cinematic images in {time.time() - generation_start:.1f} s")
+    
+    # Upscale once to the render size instead of paying for full-resolution diffusion
+    if low_res:
+        image_paths, timings = upscale_files(image_paths, output_dir=os.path.join(output_dir, "render"))
+        print(f"Upscaled {timings['images']} images to cover {RENDER_SIZE[0]}x{RENDER_SIZE[1]} "
+              f"in {timings['resize_seconds']:.1f} s (+{timings['write_seconds']:.1f} s writing)")
     
     # Save the image_paths to a global variable for use in other cells
     globals()['image_paths'] = image_paths
@@ -725,6 +710,13 @@ import sys
 import contextlib
 import random
 import traceback
+from services import subtitles
+from services.mastering import AudioMaster
+from services import audio_io
+from services.podcast_service import PodcastService
+from services.encoding_service import EncodingService
+from services.file_utils import safe_slug
+from services.narration_budget import NarrationBudget
 
 def db_to_amplitude(db: float) -> float:
     """Convert decibels to amplitude ratio"""
@@ -733,8 +725,7 @@ def db_to_amplitude(db: float) -> float:
 def convert_timestamp_to_seconds(timestamp):
     """Convert SRT timestamp to seconds"""
     try:
-        hours, minutes, seconds = timestamp.replace(',', '.').split(':')
-        return float(hours) * 3600 + float(minutes) * 60 + float(seconds)
+        return subtitles.timestamp_to_ms(timestamp) / 1000
     except Exception as e:
         print(f"Error converting timestamp {timestamp}: {str(e)}")
         # Return a default value if conversion fails
@@ -994,7 +985,7 @@ def create_final_video(image_prompts, image_paths, audio_path, title, srt_path=N
                 )
                 
                 # Create the subtitles clip
-                subtitle_clip = SubtitlesClip(srt_path, generator)
+                subtitle_clip = SubtitlesClip(subtitles.cues_to_moviepy(subtitles.read_subtitles(srt_path)), generator)
                 
                 # Set the position to bottom center with padding
                 subtitle_clip = subtitle_clip.set_position(('center', 0.85), relative=True)
@@ -1032,55 +1023,21 @@ def create_final_video(image_prompts, image_paths, audio_path, title, srt_path=N
             print(f"Error in final composition: {str(e)}")
             traceback.print_exc()
         
-        # Add ambient soundscape if available
-        if ambient_path and os.path.exists(ambient_path):
-            try:
-                print("Adding ambient sound design...")
-                ambient_audio = AudioFileClip(ambient_path)
-                
-                # Ensure ambient audio matches narration duration
-                if ambient_audio.duration < total_duration:
-                    ambient_audio = afx.audio_loop(ambient_audio, duration=total_duration)
-                else:
-                    ambient_audio = ambient_audio.subclip(0, total_duration)
-                
-                # Mix ambient sounds with narration (ambient at lower volume)
-                ambient_audio = ambient_audio.volumex(db_to_amplitude(-15))  # Lower volume for ambient
-
-                # Add background music if available
-                if os.path.exists("/content/ambient.mp3"):
-                    bg_music = (AudioFileClip("/content/ambient.mp3")
-                              .volumex(db_to_amplitude(BG_MUSIC_DB)))
-                    
-                    if bg_music.duration < total_duration:
-                        bg_music = afx.audio_loop(bg_music, duration=total_duration)
-                    else:
-                        bg_music = bg_music.subclip(0, total_duration)
-                    
-                    final_audio = CompositeAudioClip([audio, ambient_audio, bg_music])
-                else:
-                    final_audio = CompositeAudioClip([audio, ambient_audio])
-            except Exception as e:
-                print(f"Warning: Could not add ambient sound: {str(e)}")
-                final_audio = audio
-        else:
-            # Original audio handling code
-            try:
-                if os.path.exists("/content/ambient.mp3"):
-                    bg_music = (AudioFileClip("/content/ambient.mp3")
-                               .volumex(db_to_amplitude(BG_MUSIC_DB)))
-                    
-                    if bg_music.duration < total_duration:
-                        bg_music = afx.audio_loop(bg_music, duration=total_duration)
-                    else:
-                        bg_music = bg_music.subclip(0, total_duration)
-                    
-                    final_audio = CompositeAudioClip([audio, bg_music])
-                else:
-                    final_audio = audio
-            except Exception as e:
-                print(f"Warning: Could not add background music: {str(e)}")
-                final_audio = audio
+        # Master narration with ducked ambient and background music into one track
+        try:
+            print("Mastering final audio mix...")
+            # Story titles can hold path separators and other unsafe characters
+            master_path = AudioMaster().master(
+                audio_path,
+                os.path.join(output_dir, f"{safe_slug(title)}_master.wav"),
+                ambient_path=ambient_path,
+                music_path="/content/ambient.mp3",
+                music_db=BG_MUSIC_DB
+            )
+            final_audio = AudioFileClip(master_path)
+        except Exception as e:
+            print(f"Warning: Could not master audio: {str(e)}")
+            final_audio = audio
 
         # Set audio to video
         try:
@@ -1173,7 +1130,7 @@ def mount_google_drive():
 def create_output_folders():
     """Create necessary output folders in Google Drive"""
     base_path = '/content/drive/MyDrive/HorrorStoryAI'
-    folders = ['videos', 'images', 'audio', 'subtitles']
+    folders = ['videos', 'images', 'audio', 'subtitles', 'podcast']
     
     for folder in folders:
         folder_path = os.path.join(base_path, folder)
@@ -1181,8 +1138,53 @@ def create_output_folders():
     
     return base_path
 
-def run_complete_pipeline():
-    """Execute the complete story-to-video pipeline"""
+def run_podcast_output(story_data, audio_path, srt_path, scene_descriptions, ambient_path,
+                       base_path, project_folder, timestamp, start_time):
+    """Master and encode a podcast episode, then save it to Google Drive"""
+    import shutil
+    
+    print("\n6. Mastering and encoding podcast episode...")
+    with EncodingService() as encoding_service:
+        episode = PodcastService(os.path.join(project_folder, "podcast"), encoding_service).create_episode(
+            audio_path,
+            title=story_data['title'],
+            scenes=scene_descriptions,
+            ambient_path=ambient_path,
+            music_path="/content/ambient.mp3",
+            description=story_data['enhanced'][:500],
+            source_title=f"horror_story_{timestamp}"
+        )
+    
+    # Save episode files and subtitles
+    print("\n7. Saving podcast to Google Drive...")
+    for file_path in list(episode['files'].values()) + [episode['metadata_path']]:
+        if os.path.exists(file_path):
+            shutil.copy2(file_path, os.path.join(base_path, 'podcast', os.path.basename(file_path)))
+    if os.path.exists(srt_path):
+        shutil.copy2(srt_path, os.path.join(base_path, 'subtitles', os.path.basename(srt_path)))
+    
+    total_time = time.time() - start_time
+    print(f"\nPodcast pipeline executed successfully in {total_time/60:.2f} minutes!")
+    print(f"All outputs saved to: {project_folder}")
+    
+    return {
+        'project_folder': project_folder,
+        'video_path': None,
+        'image_paths': [],
+        'audio_path': audio_path,
+        'srt_path': srt_path,
+        'podcast': episode,
+        'story_data': story_data
+    }
+
+def run_complete_pipeline(audio_only=False, max_narration_seconds=900, low_res_images=False):
+    """Execute the complete story-to-video pipeline
+
+    With audio_only set, the pipeline stops after narration and ambient design and
+    produces a mastered podcast episode (MP3/Opus with chapters) instead of a video.
+    Scripts predicted to run past max_narration_seconds are trimmed before synthesis.
+    low_res_images generates images at low resolution and upscales them once.
+    """
     try:
         print("Starting complete horror story pipeline...")
         start_time = time.time()
@@ -1209,6 +1211,14 @@ def run_complete_pipeline():
         print("\n2. Generating voice-over script...")
         voice_over_script = generate_voice_over_script(story_data['enhanced'])
         
+        # Predict narration length and downstream cost before synthesis
+        budget = NarrationBudget(max_seconds=max_narration_seconds, speed=user_prefs['voice_speed'].value)
+        budget_report = budget.check(voice_over_script)
+        print(f"Budget: {budget.format_report(budget_report)}")
+        if budget_report['status'] == 'too_long':
+            print("Trimming script to the narration budget...")
+            voice_over_script = budget.trim_to_fit(voice_over_script)
+        
         # 3. Generate audio narration
         print("\n3. Generating audio narration...")
         audio_path = generate_horror_audio(voice_over_script)
@@ -1225,9 +1235,13 @@ def run_complete_pipeline():
         print("\n5.5 Generating ambient sound design...")
         ambient_path = generate_ambient_soundscape(
             scene_descriptions=scene_descriptions,
-            audio_duration=AudioFileClip(audio_path).duration
+            audio_duration=audio_io.audio_duration(audio_path)
         )
         
+        if audio_only:
+            return run_podcast_output(story_data, audio_path, srt_path, scene_descriptions,
+                                      ambient_path, base_path, project_folder, timestamp, start_time)
+        
         # 6. Generate image prompts
         print("\n6. Generating image prompts...")
         image_prompts = generate_image_prompts(scene_descriptions)
@@ -1236,9 +1250,12 @@ def run_complete_pipeline():
         print("\n7. Initializing Stable Diffusion...")
         initialize_stable_diffusion()
         
-        # 8. Generate images
+        # 8. Generate images, releasing the pipeline even when generation fails
         print("\n8. Generating images...")
-        image_paths = generate_story_images(image_prompts)
+        try:
+            image_paths = generate_story_images(image_prompts, low_res=low_res_images)
+        finally:
+            release_stable_diffusion()
         
         # 9. Create final video with ambient sound
         print("\n9. Creating final video...")
@@ -1318,190 +1335,8 @@ if __name__ == "__main__":
 
 # ===== CELL 8.5: AMBIENT SOUND DESIGN GENERATION =====
 
-import numpy as np
-import soundfile as sf
-from pydub import AudioSegment
-import random
 import os
-import re
-from typing import List, Dict, Tuple
-
-class AmbientSoundDesigner:
-    """Creates contextual ambient sound design for horror stories"""
-    
-    def __init__(self, sound_library_path="sound_effects"):
-        """Initialize with path to sound effect library"""
-        self.sound_library_path = sound_library_path
-        self.sound_categories = {
-            'indoor': ['creaking', 'footsteps', 'door', 'clock', 'breathing', 'whisper'],
-            'outdoor': ['wind', 'rain', 'thunder', 'leaves', 'branches', 'animals'],
-            'tension': ['heartbeat', 'drone', 'strings', 'pulse', 'rumble', 'static'],
-            'horror': ['scream', 'whisper', 'laugh', 'growl', 'scratch', 'thump']
-        }
-        
-        # Create sound library directory if it doesn't exist
-        os.makedirs(self.sound_library_path, exist_ok=True)
-        
-        # Download basic sound effects if library is empty
-        if not os.listdir(self.sound_library_path):
-            self._download_basic_sound_library()
-    
-    def _download_basic_sound_library(self):
-        """Download a basic set of sound effects from Freesound or similar"""
-        try:
-            import requests
-            
-            # Basic sound effects URLs (replace with actual URLs)
-            sound_urls = {
-                'indoor_creaking.wav': 'https://example.com/creaking.wav',
-                'indoor_footsteps.wav': 'https://example.com/footsteps.wav',
-                'outdoor_wind.wav': 'https://example.com/wind.wav',
-                'tension_drone.wav': 'https://example.com/drone.wav',
-                'horror_whisper.wav': 'https://example.com/whisper.wav',
-                # Add more sound effects as needed
-            }
-            
-            print("Downloading basic sound library...")
-            for filename, url in sound_urls.items():
-                try:
-                    response = requests.get(url)
-                    if response.status_code == 200:
-                        with open(os.path.join(self.sound_library_path, filename), 'wb') as f:
-                            f.write(response.content)
-                        print(f"Downloaded {filename}")
-                except Exception as e:
-                    print(f"Failed to download {filename}: {str(e)}")
-                    
-        except ImportError:
-            print("Requests library not available. Please install sound effects manually.")
-    
-    def analyze_scene(self, scene_description: str) -> Dict[str, float]:
-        """Analyze scene description to determine appropriate sound categories and intensities"""
-        scene_scores = {category: 0.0 for category in self.sound_categories}
-        
-        # Keywords that indicate different environments and moods
-        keywords = {
-            'indoor': ['room', 'house', 'building', 'inside', 'hallway', 'corridor', 'bedroom', 
-                      'kitchen', 'basement', 'attic', 'stairs', 'floor'],
-            'outdoor': ['forest', 'woods', 'outside', 'street', 'road', 'field', 'sky', 
-                       'rain', 'storm', 'wind', 'night', 'day', 'sun', 'moon'],
-            'tension': ['fear', 'anxiety', 'nervous', 'tense', 'suspense', 'dread', 
-                       'worry', 'panic', 'terror', 'horror', 'afraid'],
-            'horror': ['blood', 'scream', 'death', 'monster', 'creature', 'ghost', 
-                      'shadow', 'dark', 'evil', 'demon', 'supernatural', 'haunted']
-        }
-        
-        # Calculate scores based on keyword presence
-        for category, words in keywords.items():
-            for word in words:
-                if re.search(r'\b' + word + r'\b', scene_description.lower()):
-                    scene_scores[category] += 0.2  # Increase score for each keyword found
-        
-        # Normalize scores to range 0-1
-        max_score = max(scene_scores.values()) if max(scene_scores.values()) > 0 else 1.0
-        for category in scene_scores:
-            scene_scores[category] = min(scene_scores[category] / max_score, 1.0)
-            
-        # Ensure at least some ambient sound
-        if all(score < 0.2 for score in scene_scores.values()):
-            scene_scores['tension'] = 0.3
-            
-        return scene_scores
-    
-    def select_sounds(self, scene_scores: Dict[str, float], duration: float) -> List[Dict]:
-        """Select appropriate sound effects based on scene analysis"""
-        selected_sounds = []
-        
-        # Get available sound files
-        available_sounds = {}
-        for category in self.sound_categories:
-            available_sounds[category] = []
-            for sound_type in self.sound_categories[category]:
-                pattern = f"{category}_{sound_type}*.wav"
-                matching_files = []
-                for file in os.listdir(self.sound_library_path):
-                    if file.startswith(f"{category}_{sound_type}") and file.endswith(".wav"):
-                        matching_files.append(file)
-                available_sounds[category].extend(matching_files)
-        
-        # Select sounds based on scores
-        for category, score in scene_scores.items():
-            if score > 0.2 and available_sounds[category]:  # Only use categories with significant scores
-                num_sounds = int(score * 3)  # More sounds for higher scores
-                for _ in range(min(num_sounds, len(available_sounds[category]))):
-                    sound_file = random.choice(available_sounds[category])
-                    volume = 0.3 + (score * 0.7)  # Volume based on score (0.3-1.0)
-                    
-                    selected_sounds.append({
-                        'file': os.path.join(self.sound_library_path, sound_file),
-                        'volume': volume,
-                        'category': category,
-                        'loop': category in ['tension', 'outdoor'],  # Loop background sounds
-                        'random_start': category != 'tension'  # Random start time for non-tension sounds
-                    })
-        
-        return selected_sounds
-    
-    def create_ambient_mix(self, scene_descriptions: List[Dict], output_path: str, total_duration: float) -> str:
-        """Create a complete ambient sound mix for the entire story"""
-        # Create base silent track
-        base_track = AudioSegment.silent(duration=int(total_duration * 1000))
-        
-        # Process each scene
-        for i, scene in enumerate(scene_descriptions):
-            # Calculate scene timing
-            start_time = convert_timestamp_to_seconds(scene['start_time'])
-            end_time = convert_timestamp_to_seconds(scene['end_time'])
-            scene_duration = end_time - start_time
-            
-            # Analyze scene and select sounds
-            scene_scores = self.analyze_scene(scene['description'])
-            selected_sounds = self.select_sounds(scene_scores, scene_duration)
-            
-            print(f"Creating ambient sound for scene {i+1}/{len(scene_descriptions)}")
-            
-            # Mix sounds for this scene
-            for sound_info in selected_sounds:
-                try:
-                    # Load sound file
-                    sound = AudioSegment.from_file(sound_info['file'])
-                    
-                    # Adjust volume
-                    sound = sound - (20 - (sound_info['volume'] * 20))  # Convert to dB reduction
-                    
-                    # Handle looping for background sounds
-                    if sound_info['loop'] and sound.duration_seconds < scene_duration:
-                        loops_needed = int(scene_duration / sound.duration_seconds) + 1
-                        sound = sound * loops_needed
-                    
-                    # Trim to scene duration
-                    if sound.duration_seconds > scene_duration:
-                        # Use random start point if specified
-                        if sound_info['random_start'] and sound.duration_seconds > scene_duration * 1.5:
-                            max_start = int((sound.duration_seconds - scene_duration) * 1000)
-                            start_pos = random.randint(0, max_start)
-                            sound = sound[start_pos:start_pos + int(scene_duration * 1000)]
-                        else:
-                            sound = sound[:int(scene_duration * 1000)]
-                    
-                    # Add crossfade at beginning and end (except for tension sounds)
-                    if not sound_info['category'] == 'tension':
-                        fade_duration = min(1000, int(sound.duration_seconds * 1000 * 0.2))
-                        sound = sound.fade_in(fade_duration).fade_out(fade_duration)
-                    
-                    # Position in the timeline
-                    position_ms = int(start_time * 1000)
-                    base_track = base_track.overlay(sound, position=position_ms)
-                    
-                except Exception as e:
-                    print(f"Error processing sound {sound_info['file']}: {str(e)}")
-        
-        # Export final mix
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        base_track.export(output_path, format="wav")
-        print(f"Ambient sound design created: {output_path}")
-        
-        return output_path
+from services.ambient import AmbientSoundDesigner
 
 def generate_ambient_soundscape(scene_descriptions, audio_duration, output_dir="audio_output"):
     """Generate ambient sound design based on scene descriptions"""
@@ -5,6 +5,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPixmap
 import os
 import shutil
+from services.encoding_service import AUDIO_EXPORT_FILTER, with_filter_extension
 
 class ExportScreen(QWidget):
     """Screen for exporting and sharing the final project"""
@@ -115,7 +116,14 @@ class ExportScreen(QWidget):
         
         # Update duration
         duration_text = "Unknown"
-        if project.get('video_path'):
+        if project.get('audio_path') and os.path.exists(project['audio_path']):
+            try:
+                from services.audio_io import audio_duration
+                duration = audio_duration(project['audio_path'])
+                duration_text = f"{int(duration // 60)}m {int(duration % 60)}s"
+            except Exception:
+                pass
+        elif project.get('video_path'):
             try:
                 from moviepy.editor import VideoFileClip
                 clip = VideoFileClip(project['video_path'])
@@ -134,7 +142,7 @@ class ExportScreen(QWidget):
         if project.get('subtitles_path'):
             files_text += "Subtitles, "
         if project.get('image_paths'):
-            files_text += f"{len(project['image_paths'])} Images"
+            files_text += f"{sum(path is not None for path in project['image_paths'])} Images"
         
         if not files_text:
             files_text = "None"
@@ -181,16 +189,18 @@ class ExportScreen(QWidget):
             return
         
         # Open file dialog to select export location
-        export_path, _ = QFileDialog.getSaveFileName(
+        export_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Export Audio",
             "",
-            "WAV Files (*.wav);;All Files (*)"
+            AUDIO_EXPORT_FILTER
         )
         
         if export_path:
             try:
-                shutil.copy2(audio_path, export_path)
+                # Compressed formats are served from the encode cache
+                export_path = with_filter_extension(export_path, selected_filter)
+                self.parent.encoding_service.export(audio_path, export_path)
                 QMessageBox.information(self, "Success", f"Audio exported to {export_path}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to export audio: {str(e)}")
@@ -247,7 +257,7 @@ class ExportScreen(QWidget):
                 
                 # Copy images
                 for i, path in enumerate(image_paths):
-                    if os.path.exists(path):
+                    if path and os.path.exists(path):
                         filename = f"scene_{i+1:03d}.png"
                         shutil.copy2(path, os.path.join(images_dir, filename))
                 
@@ -305,7 +315,7 @@ class ExportScreen(QWidget):
                 # Copy images
                 if project.get('image_paths'):
                     for i, path in enumerate(project['image_paths']):
-                        if os.path.exists(path):
+                        if path and os.path.exists(path):
                             filename = f"scene_{i+1:03d}.png"
                             shutil.copy2(path, os.path.join(project_dir, "images", filename))
                 
@@ -1,33 +1,74 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QLabel, QListWidget, QListWidgetItem, QComboBox,
                             QGroupBox, QProgressBar, QMessageBox, QScrollArea,
-                            QGridLayout, QFileDialog)
+                            QGridLayout, QFileDialog, QCheckBox, QSpinBox)
 from PyQt5.QtCore import Qt, pyqtSignal, QThread, QSize
 from PyQt5.QtGui import QFont, QPixmap, QImage
 import os
 from PIL import Image
 import io
+from services.image_service import GENERATION_MODES, RenderOptions
+from services.prompt_similarity import DEFAULT_DUPLICATE_THRESHOLD
+from services.upscaler import LOW_RES_SIZE, RENDER_SIZE
 
 class ImageGenerationWorker(QThread):
     """Worker thread for generating images"""
     finished = pyqtSignal(list)  # List of image paths
     progress = pyqtSignal(int, str)  # Progress percentage, status message
+    preview_ready = pyqtSignal(int, str)  # Scene number, preview path
+    image_ready = pyqtSignal(int, str)  # Scene number, final image path
     error = pyqtSignal(str)
     
-    def __init__(self, image_service, image_prompts, style):
+    def __init__(self, image_service, image_prompts, style, mode=None, project=None, progressive=False,
+                 duplicate_threshold=None, low_res=False, workers=1):
         super().__init__()
         self.image_service = image_service
         self.image_prompts = image_prompts
         self.style = style
+        self.mode = mode
+        self.project = project
+        self.progressive = progressive
+        self.duplicate_threshold = duplicate_threshold
+        self.low_res = low_res
+        self.workers = workers
+        self.rejected = set()
+        self.completed = 0
+    
+    def reject(self, scene_index, rejected=True):
+        """Skip (or restore) full-quality generation of a previewed scene"""
+        if rejected:
+            self.rejected.add(scene_index)
+        else:
+            self.rejected.discard(scene_index)
+    
+    def completion_percent(self):
+        """Share of scenes with a final image"""
+        return int(self.completed / len(self.image_prompts) * 100)
+    
+    def on_preview(self, scene_index, path):
+        self.preview_ready.emit(scene_index, path)
+        # Previews are not completions, so the bar keeps its value
+        self.progress.emit(self.completion_percent(), f"Preview {scene_index}/{len(self.image_prompts)} ready")
+    
+    def on_image(self, scene_index, path):
+        self.completed += 1
+        self.image_ready.emit(scene_index, path)
+        self.progress.emit(self.completion_percent(),
+                           f"Generated image {self.completed}/{len(self.image_prompts)}")
     
     def run(self):
         try:
+            if self.mode:
+                self.image_service.set_mode(self.mode)
+            
             # Apply style to prompts if needed
             styled_prompts = []
             for prompt in self.image_prompts:
                 # Add style to prompt
                 styled_prompt = prompt.copy()
                 if 'prompt' in styled_prompt:
+                    # Near-duplicate scenes are detected on the unstyled scene text
+                    styled_prompt['base_prompt'] = prompt['prompt']
                     # Add style keywords based on selected style
                     if self.style == "Cinematic":
                         styled_prompt['prompt'] += ", cinematic lighting, movie scene, 35mm film"
@@ -38,14 +79,23 @@ class ImageGenerationWorker(QThread):
                 
                 styled_prompts.append(styled_prompt)
             
-            # Generate images
-            total_images = len(styled_prompts)
-            for i, _ in enumerate(styled_prompts):
-                progress_pct = int((i / total_images) * 100)
-                self.progress.emit(progress_pct, f"Generating image {i+1}/{total_images}")
+            # Low resolution generation is upscaled once to the render size
+            size = {'width': LOW_RES_SIZE[0], 'height': LOW_RES_SIZE[1], 'upscale_to': RENDER_SIZE} if self.low_res else {}
             
-            # Generate all images
-            image_paths = self.image_service.generate_story_images(styled_prompts)
+            # Generate all images, streaming previews and finished scenes
+            image_paths = self.image_service.generate_story_images(
+                styled_prompts,
+                project=self.project,
+                render=RenderOptions(
+                    workers=self.workers if self.workers > 1 else None,
+                    progressive=self.progressive,
+                    on_preview=self.on_preview,
+                    on_image=self.on_image,
+                    should_refine=lambda scene_index: scene_index not in self.rejected
+                ),
+                duplicate_threshold=self.duplicate_threshold,
+                **size
+            )
             
             self.progress.emit(100, "Image generation complete")
             self.finished.emit(image_paths)
@@ -60,6 +110,7 @@ class ImageGenerationScreen(QWidget):
         super().__init__()
         self.parent = parent
         self.image_paths = []
+        self.scene_cells = {}
         self.init_ui()
         
     def init_ui(self):
@@ -81,6 +132,42 @@ class ImageGenerationScreen(QWidget):
         self.style_combo.addItems(["Cinematic", "Realistic", "Artistic"])
         style_layout.addWidget(style_label)
         style_layout.addWidget(self.style_combo)
+        
+        # Sampling mode selection
+        mode_label = QLabel("Sampling:")
+        self.mode_combo = QComboBox()
+        for mode, settings in GENERATION_MODES.items():
+            self.mode_combo.addItem(f"{mode.capitalize()} ({settings['steps']} steps)", mode)
+        if self.parent:
+            self.mode_combo.setCurrentIndex(self.mode_combo.findData(self.parent.image_service.mode))
+        style_layout.addWidget(mode_label)
+        style_layout.addWidget(self.mode_combo)
+        
+        # Progressive previews let bad prompts be rejected before full generation
+        self.progressive_checkbox = QCheckBox("Preview first")
+        self.progressive_checkbox.setToolTip("Show quick previews of every scene before full-quality generation; "
+                                             "rejected previews are not refined")
+        style_layout.addWidget(self.progressive_checkbox)
+        
+        self.reuse_checkbox = QCheckBox("Reuse near-duplicates")
+        self.reuse_checkbox.setToolTip("Scenes with almost identical prompts reuse a reframed image "
+                                       "instead of generating a new one")
+        style_layout.addWidget(self.reuse_checkbox)
+        
+        self.low_res_checkbox = QCheckBox("Low-res + upscale")
+        self.low_res_checkbox.setToolTip(f"Generate at {LOW_RES_SIZE[0]}x{LOW_RES_SIZE[1]} and upscale once "
+                                         f"to cover {RENDER_SIZE[0]}x{RENDER_SIZE[1]}")
+        style_layout.addWidget(self.low_res_checkbox)
+        
+        # Several worker processes render scenes in parallel, each pinned to its own CPUs
+        workers_label = QLabel("Workers:")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, max(1, os.cpu_count() or 1))
+        self.workers_spin.setToolTip("Worker processes rendering scenes in parallel, each with its own pipeline; "
+                                     "previews need a single worker")
+        self.workers_spin.valueChanged.connect(self.on_workers_changed)
+        style_layout.addWidget(workers_label)
+        style_layout.addWidget(self.workers_spin)
         style_layout.addStretch()
         main_layout.addLayout(style_layout)
         
@@ -172,17 +259,35 @@ class ImageGenerationScreen(QWidget):
         self.worker = ImageGenerationWorker(
             self.parent.image_service,
             scene_descriptions,
-            style
+            style,
+            self.mode_combo.currentData(),
+            (self.parent.current_project.get('story_data') or {}).get('title'),
+            self.progressive_checkbox.isChecked(),
+            DEFAULT_DUPLICATE_THRESHOLD if self.reuse_checkbox.isChecked() else None,
+            self.low_res_checkbox.isChecked(),
+            self.workers_spin.value()
         )
         
+        # Scene cells filled as previews and images stream in
+        self.clear_grid()
+        self.scene_cells = {}
+        
         # Connect signals
         self.worker.progress.connect(self.on_generation_progress)
+        self.worker.preview_ready.connect(self.on_preview_ready)
+        self.worker.image_ready.connect(self.on_image_ready)
         self.worker.finished.connect(self.on_generation_finished)
         self.worker.error.connect(self.on_generation_error)
         
         # Start worker
         self.worker.start()
     
+    def on_workers_changed(self, workers):
+        """Previews run in this process, so they are only offered with a single worker"""
+        self.progressive_checkbox.setEnabled(workers == 1)
+        if workers > 1:
+            self.progressive_checkbox.setChecked(False)
+    
     def on_generation_progress(self, progress, status):
         """Handle generation progress update"""
         self.progress_bar.setValue(progress)
@@ -194,7 +299,8 @@ class ImageGenerationScreen(QWidget):
         self.progress_bar.setVisible(False)
         self.generate_button.setEnabled(True)
         self.generate_button.setText("Regenerate Images")
-        self.status_label.setText(f"Generated {len(image_paths)} images")
+        generated = sum(path is not None for path in image_paths)
+        self.status_label.setText(f"Generated {generated} images")
         
         # Display images in grid
         self.display_images(image_paths)
@@ -211,22 +317,59 @@ class ImageGenerationScreen(QWidget):
             self.parent.current_project['image_paths'] = image_paths
             
         # Show success message
-        QMessageBox.information(self, "Success", f"Successfully generated {len(image_paths)} images!")
+        QMessageBox.information(self, "Success", f"Successfully generated {generated} images!")
     
-    def display_images(self, image_paths):
-        """Display images in the grid layout"""
-        # Clear existing items
+    def clear_grid(self):
+        """Remove every widget from the image grid"""
         while self.image_grid.count():
             item = self.image_grid.takeAt(0)
             widget = item.widget()
             if widget:
                 widget.deleteLater()
+    
+    def scene_cell(self, scene_index):
+        """Grid cell (image label, reject button) of a scene, created on first use"""
+        if scene_index not in self.scene_cells:
+            cell = QWidget()
+            cell_layout = QVBoxLayout(cell)
+            img_label = QLabel(f"Scene {scene_index}")
+            img_label.setAlignment(Qt.AlignCenter)
+            reject_button = QPushButton("Reject")
+            reject_button.setCheckable(True)
+            reject_button.setVisible(False)
+            reject_button.toggled.connect(lambda checked: self.worker.reject(scene_index, checked))
+            cell_layout.addWidget(img_label)
+            cell_layout.addWidget(reject_button)
+            self.image_grid.addWidget(cell, (scene_index - 1) // 3, (scene_index - 1) % 3)
+            self.scene_cells[scene_index] = (img_label, reject_button)
+        return self.scene_cells[scene_index]
+    
+    def on_preview_ready(self, scene_index, path):
+        """Show a scene preview that can be rejected before refinement"""
+        img_label, reject_button = self.scene_cell(scene_index)
+        img_label.setPixmap(QPixmap(path).scaled(300, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        reject_button.setVisible(True)
+    
+    def on_image_ready(self, scene_index, path):
+        """Replace a scene's preview with its final image"""
+        img_label, reject_button = self.scene_cell(scene_index)
+        img_label.setPixmap(QPixmap(path).scaled(300, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        reject_button.setVisible(False)
+    
+    def display_images(self, image_paths):
+        """Display images in the grid layout"""
+        # Clear existing items
+        self.clear_grid()
+        self.scene_cells = {}
         
         # Add images to grid
         row, col = 0, 0
         max_cols = 3  # Number of columns in the grid
         
         for i, path in enumerate(image_paths):
+            # Failed scenes have no image
+            if path is None:
+                continue
             try:
                 # Create image label
                 img_label = QLabel()
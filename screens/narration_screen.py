@@ -216,6 +216,9 @@ class NarrationScreen(QWidget):
         if self.parent:
             self.parent.current_project['audio_path'] = audio_path
             
+            # Encode compressed deliverables in the background
+            self.parent.encoding_service.start_encodes(audio_path)
+            
         # Show success message
         QMessageBox.information(self, "Success", "Narration generated successfully!")
     
@@ -261,17 +264,18 @@ class NarrationScreen(QWidget):
             return
         
         # Open file dialog to select export location
-        export_path, _ = QFileDialog.getSaveFileName(
+        from services.encoding_service import AUDIO_EXPORT_FILTER, with_filter_extension
+        export_path, selected_filter = QFileDialog.getSaveFileName(
             self,
             "Export Narration Audio",
             "",
-            "WAV Files (*.wav);;All Files (*)"
+            AUDIO_EXPORT_FILTER
         )
         
         if export_path:
             try:
-                import shutil
-                shutil.copy2(self.audio_path, export_path)
+                export_path = with_filter_extension(export_path, selected_filter)
+                self.parent.encoding_service.export(self.audio_path, export_path)
                 QMessageBox.information(self, "Success", f"Audio exported to {export_path}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to export audio: {str(e)}")
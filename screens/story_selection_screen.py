@@ -4,6 +4,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                             QProgressBar)
 from PyQt5.QtCore import Qt, pyqtSignal, QThread
 import random
+from services.narration_budget import NarrationBudget
 
 class StoryFetchWorker(QThread):
     """Worker thread for fetching stories"""
@@ -116,6 +117,26 @@ class StorySelectionScreen(QWidget):
         self.story_content.setReadOnly(True)
         right_layout.addWidget(self.story_content)
         
+        # Narration duration budget
+        budget_layout = QHBoxLayout()
+        budget_layout.addWidget(QLabel("Narration length (min):"))
+        self.min_minutes_spinbox = QSpinBox()
+        self.min_minutes_spinbox.setRange(1, 60)
+        self.min_minutes_spinbox.setValue(4)
+        budget_layout.addWidget(self.min_minutes_spinbox)
+        budget_layout.addWidget(QLabel("to"))
+        self.max_minutes_spinbox = QSpinBox()
+        self.max_minutes_spinbox.setRange(2, 120)
+        self.max_minutes_spinbox.setValue(12)
+        budget_layout.addWidget(self.max_minutes_spinbox)
+        budget_layout.addStretch()
+        right_layout.addLayout(budget_layout)
+        
+        # Predicted narration length and processing cost
+        self.budget_label = QLabel("")
+        self.budget_label.setWordWrap(True)
+        right_layout.addWidget(self.budget_label)
+        
         # Enhance button
         self.enhance_button = QPushButton("Enhance Story")
         self.enhance_button.clicked.connect(self.on_enhance_clicked)
@@ -227,9 +248,14 @@ class StorySelectionScreen(QWidget):
         self.enhance_button.setEnabled(False)
         self.enhance_button.setText("Enhancing...")
         
-        # Enhance the story using AI service
+        # Enhance the story to fit the narration budget (default voice speed)
         try:
-            enhanced_text = self.parent.ai_service.enhance_story(self.selected_story.selftext)
+            min_minutes = self.min_minutes_spinbox.value()
+            max_minutes = max(self.max_minutes_spinbox.value(), min_minutes + 1)
+            budget = NarrationBudget(min_seconds=min_minutes * 60, max_seconds=max_minutes * 60)
+            enhanced_text = self.parent.ai_service.enhance_story(self.selected_story.selftext, budget=budget)
+            budget_report = budget.check(enhanced_text)
+            self.budget_label.setText(budget.format_report(budget_report))
             
             # Update UI
             self.story_content.setText(enhanced_text)
@@ -249,6 +275,7 @@ class StorySelectionScreen(QWidget):
                 'subreddit': self.selected_story.subreddit.display_name,
                 'story_id': self.selected_story.id
             }
+            self.parent.current_project['budget_report'] = budget_report
             
             # Re-enable enhance button
             self.enhance_button.setText("Re-Enhance Story")
@@ -1,9 +1,12 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QLabel, QListWidget, QListWidgetItem, QTextEdit,
-                            QGroupBox, QProgressBar, QMessageBox, QFileDialog)
+                            QGroupBox, QProgressBar, QMessageBox, QFileDialog,
+                            QComboBox, QCheckBox, QSpinBox)
 from PyQt5.QtCore import Qt, pyqtSignal, QThread
 from PyQt5.QtGui import QFont
 import os
+from services.timeline import Timeline
+from services.scene_planner import ScenePlanner
 
 class SubtitleGenerationWorker(QThread):
     """Worker thread for generating subtitles"""
@@ -11,16 +14,17 @@ class SubtitleGenerationWorker(QThread):
     progress = pyqtSignal(int)
     error = pyqtSignal(str)
     
-    def __init__(self, audio_service, audio_path):
+    def __init__(self, audio_service, audio_path, chunked=False):
         super().__init__()
         self.audio_service = audio_service
         self.audio_path = audio_path
+        self.chunked = chunked
     
     def run(self):
         try:
             # Generate subtitles
             self.progress.emit(10)
-            srt_path = self.audio_service.generate_subtitles(self.audio_path)
+            srt_path = self.audio_service.generate_subtitles(self.audio_path, chunked=self.chunked)
             
             if srt_path:
                 self.progress.emit(100)
@@ -52,6 +56,39 @@ class SubtitlesScreen(QWidget):
         title_label.setFont(title_font)
         main_layout.addWidget(title_label)
         
+        # Speech recognition settings
+        asr_layout = QHBoxLayout()
+        backend_label = QLabel("Recognition Backend:")
+        self.backend_combo = QComboBox()
+        self.backend_combo.addItems(["auto", "whisper", "faster-whisper"])
+        model_label = QLabel("Model Size:")
+        self.model_combo = QComboBox()
+        self.model_combo.addItems(["tiny", "base", "small", "medium", "large-v3"])
+        self.model_combo.setCurrentText("base")
+        asr_layout.addWidget(backend_label)
+        asr_layout.addWidget(self.backend_combo)
+        asr_layout.addWidget(model_label)
+        asr_layout.addWidget(self.model_combo)
+        self.chunked_checkbox = QCheckBox("Parallel Chunked Transcription")
+        asr_layout.addWidget(self.chunked_checkbox)
+        asr_layout.addStretch()
+        main_layout.addLayout(asr_layout)
+        
+        # Scene planning settings (0 images per minute = no budget)
+        planner_layout = QHBoxLayout()
+        planner_layout.addWidget(QLabel("Shot Length (s):"))
+        self.shot_length_spinbox = QSpinBox()
+        self.shot_length_spinbox.setRange(4, 30)
+        self.shot_length_spinbox.setValue(8)
+        planner_layout.addWidget(self.shot_length_spinbox)
+        planner_layout.addWidget(QLabel("Images per Minute:"))
+        self.images_per_minute_spinbox = QSpinBox()
+        self.images_per_minute_spinbox.setRange(0, 30)
+        self.images_per_minute_spinbox.setSpecialValueText("No limit")
+        planner_layout.addWidget(self.images_per_minute_spinbox)
+        planner_layout.addStretch()
+        main_layout.addLayout(planner_layout)
+        
         # Generate button
         self.generate_button = QPushButton("Generate Subtitles")
         self.generate_button.clicked.connect(self.on_generate_clicked)
@@ -122,6 +159,12 @@ class SubtitlesScreen(QWidget):
             QMessageBox.warning(self, "Warning", "Audio file not found")
             return
         
+        # Apply selected speech recognition settings
+        self.parent.audio_service.set_asr_backend(
+            self.backend_combo.currentText(),
+            self.model_combo.currentText()
+        )
+        
         # Show progress
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
@@ -131,7 +174,8 @@ class SubtitlesScreen(QWidget):
         # Create worker thread
         self.worker = SubtitleGenerationWorker(
             self.parent.audio_service,
-            audio_path
+            audio_path,
+            chunked=self.chunked_checkbox.isChecked()
         )
         
         # Connect signals
@@ -160,6 +204,7 @@ class SubtitlesScreen(QWidget):
         # Update project data
         if self.parent:
             self.parent.current_project['subtitles_path'] = srt_path
+            self.parent.current_project['timeline'] = Timeline.from_srt(srt_path)
             
         # Show success message
         QMessageBox.information(self, "Success", "Subtitles generated successfully!")
@@ -221,12 +266,24 @@ class SubtitlesScreen(QWidget):
                     self.next_button.setEnabled(False)
                     
                     # Generate scene descriptions
+                    shot_length = self.shot_length_spinbox.value()
+                    planner = ScenePlanner(
+                        target_shot_seconds=shot_length,
+                        min_shot_seconds=shot_length / 2,
+                        max_shot_seconds=shot_length * 1.75,
+                        images_per_minute=self.images_per_minute_spinbox.value() or None
+                    )
                     scene_descriptions = self.parent.ai_service.generate_scene_descriptions(
-                        self.subtitle_segments
+                        self.subtitle_segments,
+                        planner=planner
                     )
                     
                     # Update project data
                     self.parent.current_project['scene_descriptions'] = scene_descriptions
+                    if self.parent.current_project.get('timeline'):
+                        self.parent.current_project['timeline'] = (
+                            self.parent.current_project['timeline'].with_scenes(scene_descriptions)
+                        )
                     
                     # Hide progress
                     self.progress_bar.setVisible(False)
@@ -14,7 +14,7 @@ class VideoCompilationWorker(QThread):
     
     def __init__(self, video_service, image_prompts, image_paths, audio_path, 
                  title, srt_path, ambient_path, video_quality, cinematic_ratio, 
-                 use_dust_overlay):
+                 use_dust_overlay, timeline=None, audio_service=None, scenes=None):
         super().__init__()
         self.video_service = video_service
         self.image_prompts = image_prompts
@@ -26,9 +26,22 @@ class VideoCompilationWorker(QThread):
         self.video_quality = video_quality
         self.cinematic_ratio = cinematic_ratio
         self.use_dust_overlay = use_dust_overlay
+        self.timeline = timeline
+        self.audio_service = audio_service
+        self.scenes = scenes
     
     def run(self):
         try:
+            # Design the ambient soundscape if requested
+            if self.ambient_path is None and self.audio_service is not None and self.scenes:
+                self.progress.emit(5, "Designing ambient soundscape...")
+                from services.audio_io import audio_duration
+                self.ambient_path = self.audio_service.generate_ambient_soundscape(
+                    self.scenes,
+                    audio_duration(self.audio_path),
+                    narration_path=self.audio_path
+                )
+            
             # Update progress
             self.progress.emit(10, "Starting video compilation...")
             
@@ -42,7 +55,8 @@ class VideoCompilationWorker(QThread):
                 ambient_path=self.ambient_path,
                 video_quality=self.video_quality,
                 cinematic_ratio=self.cinematic_ratio,
-                use_dust_overlay=self.use_dust_overlay
+                use_dust_overlay=self.use_dust_overlay,
+                timeline=self.timeline
             )
             
             if video_path:
@@ -102,6 +116,9 @@ class VideoCompilationScreen(QWidget):
         self.dust_checkbox = QCheckBox("Add Dust Overlay Effect")
         self.dust_checkbox.setChecked(True)
         effects_layout.addWidget(self.dust_checkbox)
+        self.ambient_checkbox = QCheckBox("Add Ambient Soundscape")
+        self.ambient_checkbox.setChecked(True)
+        effects_layout.addWidget(self.ambient_checkbox)
         settings_layout.addLayout(effects_layout)
         
         settings_group.setLayout(settings_layout)
@@ -225,6 +242,15 @@ class VideoCompilationScreen(QWidget):
         if project.get('story_data') and 'title' in project['story_data']:
             title = project['story_data']['title']
         
+        # Scenes for the ambient soundscape (timeline preferred)
+        ambient_scenes = None
+        if self.ambient_checkbox.isChecked():
+            timeline = project.get('timeline')
+            if timeline is not None and len(timeline.scenes) > 0:
+                ambient_scenes = timeline
+            else:
+                ambient_scenes = project.get('scene_descriptions')
+        
         # Show progress
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
@@ -240,10 +266,13 @@ class VideoCompilationScreen(QWidget):
             project.get('audio_path', ''),
             title,
             project.get('subtitles_path', None),
-            None,  # Ambient path (not implemented yet)
+            None,  # Ambient path (designed by the worker)
             video_quality,
             cinematic_ratio,
-            use_dust_overlay
+            use_dust_overlay,
+            timeline=project.get('timeline'),
+            audio_service=self.parent.audio_service,
+            scenes=ambient_scenes
         )
         
         # Connect signals
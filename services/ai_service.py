@@ -1,5 +1,6 @@
 from google import genai
 import time
+from services.scene_planner import ScenePlanner
 
 class AIService:
     """Service for AI-powered text generation and analysis"""
@@ -41,8 +42,12 @@ Return only the number."""
             # Return a random story if selection fails
             return random.choice(selection_stories)
     
-    def enhance_story(self, story_text):
-        """Enhance a story into a podcast format with intro/outro"""
+    def enhance_story(self, story_text, budget=None):
+        """Enhance a story into a podcast format with intro/outro
+        
+        With a NarrationBudget, the script is requested at a word count that fits the
+        budget's duration window, revised once if it misses, and trimmed if still too long.
+        """
         enhancement_prompt = """Transform this story into a voice over script with the following structure:
 
 1. Start with a powerful hook about the story's theme (2-3 sentences)
@@ -54,31 +59,69 @@ Return only the number."""
    - Atmospheric descriptions
 4. End with: "That concludes tonight's tale from The Withering Club. If this story kept you up at night, remember to like, share, and subscribe to join our growing community of darkness seekers. Until next time, remember... the best stories are the ones that follow you home. Sleep well, if you can."
 
+{length}
 Original Story: {content}
 
 Return ONLY the complete script text with no additional formatting, explanations, or markdown."""
 
+        length_instruction = ""
+        if budget is not None:
+            min_words, max_words = budget.word_window()
+            length_instruction = f"5. The complete script must be between {min_words} and {max_words} words long\n"
+
         # Get enhanced story
         enhanced_story = self.client.models.generate_content(
             model="gemini-2.0-flash",
-            contents=enhancement_prompt.format(content=story_text)
+            contents=enhancement_prompt.format(content=story_text, length=length_instruction)
         ).text
 
         # Clean up the enhanced story
         enhanced_story = enhanced_story.strip()
         
+        if budget is not None:
+            enhanced_story = self.fit_script_to_budget(enhanced_story, budget)
+        
         return enhanced_story
     
-    def generate_scene_descriptions(self, subtitle_segments, delay_seconds=2):
-        """Generate cinematic scene descriptions based on subtitle segments"""
-        scene_descriptions = []
+    def fit_script_to_budget(self, script, budget):
+        """Revise a script once to fit the budget's word window, trimming as a last resort"""
+        report = budget.check(script)
+        if report['status'] == 'ok':
+            return script
+        
+        min_words, max_words = report['word_window']
+        direction = "Shorten" if report['status'] == 'too_long' else "Expand"
+        revision_prompt = f"""{direction} this voice over script to between {min_words} and {max_words} words. It is currently {report['words']} words.
+Keep the hook, the Withering Club intro and the closing lines exactly as they are, and keep the story's beginning, middle and end.
+
+Script: {script}
+
+Return ONLY the complete script text with no additional formatting, explanations, or markdown."""
+        
+        try:
+            script = self.client.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=revision_prompt
+            ).text.strip()
+        except Exception as e:
+            print(f"Error revising script length: {str(e)}")
         
-        chunk_size = 2
+        if budget.check(script)['status'] == 'too_long':
+            script = budget.trim_to_fit(script)
+        return script
+    
+    def generate_scene_descriptions(self, subtitle_segments, delay_seconds=2, planner=None):
+        """Generate cinematic scene descriptions based on subtitle segments
+        
+        Segments are grouped into shots by a ScenePlanner (default: ~8 second shots at
+        sentence boundaries), so the scene count follows story length, not segmentation.
+        """
+        scene_descriptions = []
+        shots = (planner or ScenePlanner()).plan_segments(subtitle_segments)
         max_retries = 3
         
-        for i in range(0, len(subtitle_segments) - chunk_size + 1, chunk_size):
-            chunk = subtitle_segments[i:i + chunk_size]
-            combined_text = ' '.join([seg['text'] for seg in chunk])
+        for shot in shots:
+            combined_text = shot['text']
             
             # Enhanced prompt focusing on visual storytelling and scenario creation
             prompt = f"""
@@ -120,8 +163,8 @@ Return ONLY the complete script text with no additional formatting, explanations
                         .strip())
                     
                     scene_descriptions.append({
-                        'start_time': chunk[0]['start_time'],
-                        'end_time': chunk[-1]['end_time'],
+                        'start_time': shot['start_time'],
+                        'end_time': shot['end_time'],
                         'description': cleaned_response
                     })
                     
@@ -138,8 +181,8 @@ Return ONLY the complete script text with no additional formatting, explanations
                             print(f"Failed after {max_retries} attempts, using fallback description")
                             fallback_desc = "A dimly lit room with shadows stretching across the walls. A figure stands motionless, their face obscured by darkness as moonlight filters through a nearby window."
                             scene_descriptions.append({
-                                'start_time': chunk[0]['start_time'],
-                                'end_time': chunk[-1]['end_time'],
+                                'start_time': shot['start_time'],
+                                'end_time': shot['end_time'],
                                 'description': fallback_desc
                             })
                     else:
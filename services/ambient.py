@@ -0,0 +1,586 @@
+import os
+import re
+import json
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import soundfile as sf
+from services import subtitles
+from services.file_utils import load_json, save_json_atomic
+from services.loudness import integrated_loudness
+from services.timeline import Timeline
+
+# Sound types available in each ambient category
+SOUND_CATEGORIES = {
+    'indoor': ['creaking', 'footsteps', 'door', 'clock', 'breathing', 'whisper'],
+    'outdoor': ['wind', 'rain', 'thunder', 'leaves', 'branches', 'animals'],
+    'tension': ['heartbeat', 'drone', 'strings', 'pulse', 'rumble', 'static'],
+    'horror': ['scream', 'whisper', 'laugh', 'growl', 'scratch', 'thump']
+}
+
+# Keywords that indicate different environments and moods
+SCENE_KEYWORDS = {
+    'indoor': ['room', 'house', 'building', 'inside', 'hallway', 'corridor', 'bedroom',
+               'kitchen', 'basement', 'attic', 'stairs', 'floor'],
+    'outdoor': ['forest', 'woods', 'outside', 'street', 'road', 'field', 'sky',
+                'rain', 'storm', 'wind', 'night', 'day', 'sun', 'moon'],
+    'tension': ['fear', 'anxiety', 'nervous', 'tense', 'suspense', 'dread',
+                'worry', 'panic', 'terror', 'horror', 'afraid'],
+    'horror': ['blood', 'scream', 'death', 'monster', 'creature', 'ghost',
+               'shadow', 'dark', 'evil', 'demon', 'supernatural', 'haunted']
+}
+
+# Loudness every effect is staged to before its selection volume is applied
+REFERENCE_LOUDNESS_LUFS = -23.0
+MAX_LOUDNESS_CORRECTION_DB = 18.0
+
+def resample(samples, source_rate, target_rate):
+    """Resample mono float32 audio with linear interpolation"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples.astype(np.float32, copy=False)
+    target_length = int(round(len(samples) * target_rate / source_rate))
+    positions = np.arange(target_length, dtype=np.float64) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def load_sound(path, sample_rate):
+    """Decode a sound file to mono float32 at sample_rate"""
+    samples, source_rate = sf.read(path, dtype='float32', always_2d=True)
+    return resample(samples.mean(axis=1), source_rate, sample_rate)
+
+class SoundLibraryCache:
+    """Memory-bounded LRU cache of effects decoded to float32 at the mix rate
+
+    Entries are keyed by path, modification time and sample rate, so edited files are
+    decoded again. With mmap_dir set, decoded PCM is stored as .npy files and mapped
+    read-only, letting the OS page cache hold it and later processes reuse it.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024, mmap_dir=None):
+        """Create an empty cache holding at most max_bytes of decoded audio"""
+        self.max_bytes = max_bytes
+        self.mmap_dir = mmap_dir
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        if self.mmap_dir:
+            os.makedirs(self.mmap_dir, exist_ok=True)
+
+    def _key(self, path, sample_rate):
+        """Cache key for a file at a sample rate"""
+        path = os.path.abspath(path)
+        return (path, os.path.getmtime(path), sample_rate)
+
+    def _mmap_path(self, key):
+        """Location of the decoded PCM for a key"""
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.mmap_dir, f"{digest}.npy")
+
+    def _decode(self, key):
+        """Decode a file, going through the memory-mapped store when enabled"""
+        path, _, sample_rate = key
+        if not self.mmap_dir:
+            return load_sound(path, sample_rate)
+
+        mmap_path = self._mmap_path(key)
+        if not os.path.exists(mmap_path):
+            temp_path = f"{mmap_path}.{os.getpid()}.tmp.npy"
+            np.save(temp_path, load_sound(path, sample_rate))
+            os.replace(temp_path, mmap_path)
+        return np.load(mmap_path, mmap_mode='r')
+
+    def get(self, path, sample_rate):
+        """Return the decoded samples for path, decoding on first use (read-only array)"""
+        key = self._key(path, sample_rate)
+
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+
+        samples = self._decode(key)
+        if isinstance(samples, np.ndarray) and not isinstance(samples, np.memmap):
+            samples.setflags(write=False)
+
+        with self.lock:
+            self.misses += 1
+            if key not in self.entries:
+                self.entries[key] = samples
+                self.current_bytes += samples.nbytes
+                self._evict()
+        return samples
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its budget"""
+        while self.current_bytes > self.max_bytes and len(self.entries) > 1:
+            _, samples = self.entries.popitem(last=False)
+            self.current_bytes -= samples.nbytes
+
+    def clear(self):
+        """Remove all in-memory entries"""
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return hit/miss counters and memory use"""
+        return {
+            'entries': len(self.entries),
+            'bytes': self.current_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+# Process-wide cache shared by every designer in a long-running worker
+_shared_sound_cache = None
+
+def get_sound_cache():
+    """Return the process-wide sound library cache"""
+    global _shared_sound_cache
+    if _shared_sound_cache is None:
+        _shared_sound_cache = SoundLibraryCache(
+            max_bytes=int(os.environ.get("SOUND_CACHE_MAX_MB", "512")) * 1024 * 1024,
+            mmap_dir=os.environ.get("SOUND_CACHE_MMAP_DIR") or None
+        )
+    return _shared_sound_cache
+
+class AccumulationMixer:
+    """Mixes gain-scaled, faded sources into one preallocated float32 buffer in place
+
+    Sources are added block by block through a small scratch buffer, so the cost of a
+    mix scales with the total length of the sources rather than the story length.
+    """
+
+    def __init__(self, length, block_size=65536):
+        """Allocate a silent buffer of length samples"""
+        self.buffer = np.zeros(length, dtype=np.float32)
+        self.block_size = block_size
+        self.scratch = np.empty(block_size, dtype=np.float32)
+
+    def add(self, source, start, length, gain=1.0, offset=0, loop=False, fade=0):
+        """Add length samples of source at start, reading from offset
+
+        Looping sources are read modulo their length instead of being repeated in memory.
+        A non-zero fade applies linear fade-in and fade-out ramps of that many samples.
+        """
+        source_length = len(source)
+        length = min(length, len(self.buffer) - start)
+        if not loop:
+            length = min(length, source_length - offset)
+        if source_length == 0 or length <= 0:
+            return
+
+        position = 0
+        while position < length:
+            source_position = (offset + position) % source_length if loop else offset + position
+            count = min(self.block_size, length - position, source_length - source_position)
+
+            block = self.scratch[:count]
+            np.multiply(source[source_position:source_position + count], gain, out=block)
+
+            # Ramps are evaluated only over the samples inside a fade region
+            if fade:
+                head_end = min(fade, position + count)
+                if position < head_end:
+                    block[:head_end - position] *= np.arange(position, head_end, dtype=np.float32) / fade
+                tail_start = max(length - fade, position, head_end)
+                if tail_start < position + count:
+                    ramp = np.arange(tail_start, position + count, dtype=np.float32)
+                    block[tail_start - position:] *= (length - 1 - ramp) / fade
+
+            target = self.buffer[start + position:start + position + count]
+            np.add(target, block, out=target)
+            position += count
+
+    def normalize_peak(self, ceiling=1.0):
+        """Scale the buffer down in place if its peak exceeds ceiling"""
+        if len(self.buffer) == 0:
+            return
+        peak = max(float(self.buffer.max()), -float(self.buffer.min()))
+        if peak > ceiling:
+            self.buffer *= ceiling / peak
+
+def volume_to_gain(volume):
+    """Map a 0-1 selection volume to linear gain (0 dB at 1.0, -20 dB at 0.0)"""
+    return 10 ** (-(20 - volume * 20) / 20)
+
+def find_loop_points(samples, sample_rate, window_seconds=0.01, max_candidates=256):
+    """Pick loop start/end samples at rising zero crossings with matching waveforms
+
+    The end point is the crossing in the last quarter of the sound whose following
+    window best matches the window after the start, so looping clicks as little as possible.
+    """
+    length = len(samples)
+    window = max(int(window_seconds * sample_rate), 1)
+    if length < 4 * window:
+        return 0, length
+
+    rising = np.flatnonzero((samples[:-1] < 0) & (samples[1:] >= 0)) + 1
+    rising = rising[rising < length - window]
+    if len(rising) < 2:
+        return 0, length
+
+    loop_start = int(rising[0]) if rising[0] < length // 4 else 0
+    candidates = rising[rising >= max(loop_start + length // 2, length * 3 // 4)]
+    if len(candidates) == 0:
+        return loop_start, length
+    if len(candidates) > max_candidates:
+        candidates = candidates[np.linspace(0, len(candidates) - 1, max_candidates).astype(np.int64)]
+
+    reference = samples[loop_start:loop_start + window]
+    windows = np.lib.stride_tricks.sliding_window_view(samples, window)[candidates]
+    errors = np.square(windows - reference).sum(axis=1)
+    return loop_start, int(candidates[np.argmin(errors)])
+
+class SoundLibraryIndex:
+    """Persisted metadata for every effect in the sound library
+
+    Maps category to files along with duration, sample rate, integrated loudness and
+    loop points. The index is stored as JSON next to the library directory and is only
+    rebuilt when the directory modification time changes; unchanged files keep their
+    previously measured metadata.
+    """
+
+    VERSION = 1
+
+    def __init__(self, library_path, categories=SOUND_CATEGORIES, index_path=None):
+        """Create an index for library_path, loading the persisted copy if present"""
+        self.library_path = library_path
+        self.categories = categories
+        self.index_path = index_path or os.path.normpath(library_path) + ".index.json"
+        self.library_mtime = None
+        self.entries = {}
+        self.by_category = {category: [] for category in categories}
+        self._load()
+
+    def _classify(self, file):
+        """Return (category, sound type) for a library filename, or (None, None)"""
+        if not file.endswith(".wav"):
+            return None, None
+        for category, sound_types in self.categories.items():
+            for sound_type in sound_types:
+                if file.startswith(f"{category}_{sound_type}"):
+                    return category, sound_type
+        return None, None
+
+    def _load(self):
+        """Read the persisted index, ignoring unreadable or outdated files"""
+        data = load_json(self.index_path, self.VERSION)
+        if data is None:
+            return
+        self.library_mtime = data.get('library_mtime')
+        self.entries = data.get('entries', {})
+        self._group()
+
+    def _save(self):
+        """Write the index atomically"""
+        save_json_atomic(self.index_path, {'version': self.VERSION, 'library_mtime': self.library_mtime,
+                                           'entries': self.entries})
+
+    def _group(self):
+        """Rebuild the category lookup from the entries"""
+        self.by_category = {category: [] for category in self.categories}
+        for file in sorted(self.entries):
+            category = self.entries[file]['category']
+            if category in self.by_category:
+                self.by_category[category].append(file)
+
+    def _describe(self, file):
+        """Decode one file and measure its metadata"""
+        path = os.path.join(self.library_path, file)
+        stat = os.stat(path)
+        samples, sample_rate = sf.read(path, dtype='float32', always_2d=True)
+        samples = samples.mean(axis=1)
+        loop_start, loop_end = find_loop_points(samples, sample_rate)
+        category, sound_type = self._classify(file)
+        return {
+            'category': category,
+            'type': sound_type,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'duration': len(samples) / sample_rate,
+            'sample_rate': sample_rate,
+            'loudness': integrated_loudness(samples, sample_rate),
+            'loop_start': loop_start / sample_rate,
+            'loop_end': loop_end / sample_rate
+        }
+
+    def refresh(self):
+        """Rebuild the index if the library directory changed since it was built"""
+        library_mtime = os.path.getmtime(self.library_path)
+        if library_mtime == self.library_mtime:
+            return False
+
+        entries = {}
+        for file in sorted(os.listdir(self.library_path)):
+            if self._classify(file)[0] is None:
+                continue
+            stat = os.stat(os.path.join(self.library_path, file))
+            previous = self.entries.get(file)
+            if previous and previous['mtime'] == stat.st_mtime and previous['size'] == stat.st_size:
+                entries[file] = previous
+                continue
+            try:
+                entries[file] = self._describe(file)
+            except Exception as e:
+                print(f"Error indexing sound {file}: {str(e)}")
+
+        self.entries = entries
+        self.library_mtime = library_mtime
+        self._group()
+        try:
+            self._save()
+        except OSError as e:
+            print(f"Could not save sound library index: {str(e)}")
+        return True
+
+    def files(self, category):
+        """Return the indexed files of a category"""
+        return self.by_category.get(category, [])
+
+    def metadata(self, file):
+        """Return the stored metadata of a file, or None"""
+        return self.entries.get(file)
+
+    def staging_gain(self, file):
+        """Linear gain bringing a file to the reference loudness, from stored metadata"""
+        entry = self.entries.get(file)
+        if not entry or entry.get('loudness') is None:
+            return 1.0
+        correction = REFERENCE_LOUDNESS_LUFS - entry['loudness']
+        correction = max(-MAX_LOUDNESS_CORRECTION_DB, min(MAX_LOUDNESS_CORRECTION_DB, correction))
+        return 10 ** (correction / 20)
+
+# Score each matched keyword adds unless a config gives it its own weight
+DEFAULT_KEYWORD_WEIGHT = 0.2
+
+class SceneClassifier:
+    """Scores scene descriptions against weighted keyword lists in one pass
+
+    Descriptions are tokenized once with a precompiled pattern and every token (and
+    n-gram, for multi-word keywords) is looked up in a single vocabulary. Scores for a
+    whole story come from one matrix product over the matched keywords.
+    """
+
+    TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, keywords=None, categories=None):
+        """Build the vocabulary from {category: [words] or {word: weight}}"""
+        keywords = keywords if keywords is not None else SCENE_KEYWORDS
+        self.categories = list(categories if categories is not None else keywords)
+        category_index = {category: i for i, category in enumerate(self.categories)}
+
+        self.vocabulary = {}
+        weights = []
+        for category, words in keywords.items():
+            if category not in category_index:
+                continue
+            if not isinstance(words, dict):
+                words = {word: DEFAULT_KEYWORD_WEIGHT for word in words}
+            for word, weight in words.items():
+                word = ' '.join(self.TOKEN_PATTERN.findall(word.lower()))
+                if not word:
+                    continue
+                if word not in self.vocabulary:
+                    self.vocabulary[word] = len(weights)
+                    weights.append(np.zeros(len(self.categories)))
+                weights[self.vocabulary[word]][category_index[category]] += weight
+
+        self.weights = np.array(weights).reshape(len(weights), len(self.categories))
+        self.max_ngram = max((word.count(' ') + 1 for word in self.vocabulary), default=1)
+
+    @classmethod
+    def from_config(cls, path, categories=None):
+        """Load weighted keyword lists from a JSON file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), categories)
+
+    def keyword_ids(self, description):
+        """Return the vocabulary ids of the distinct keywords in a description"""
+        tokens = self.TOKEN_PATTERN.findall(description.lower())
+        found = set()
+        for n in range(1, self.max_ngram + 1):
+            for i in range(len(tokens) - n + 1):
+                keyword_id = self.vocabulary.get(tokens[i] if n == 1 else ' '.join(tokens[i:i + n]))
+                if keyword_id is not None:
+                    found.add(keyword_id)
+        return found
+
+    def score_matrix(self, descriptions):
+        """Raw category scores as a (scenes, categories) array"""
+        rows, columns = [], []
+        for row, description in enumerate(descriptions):
+            ids = self.keyword_ids(description)
+            rows.extend([row] * len(ids))
+            columns.extend(ids)
+
+        matches = np.zeros((len(descriptions), len(self.vocabulary)))
+        matches[rows, columns] = 1.0
+        return matches @ self.weights
+
+    def classify_many(self, descriptions):
+        """Return normalized score dicts for every description"""
+        scores = self.score_matrix(descriptions)
+
+        # Normalize each scene by its best category to range 0-1
+        peaks = scores.max(axis=1, initial=0.0, keepdims=True)
+        scores = np.minimum(scores / np.where(peaks > 0, peaks, 1.0), 1.0)
+
+        # Ensure at least some ambient sound
+        if 'tension' in self.categories:
+            quiet = (scores < 0.2).all(axis=1)
+            scores[quiet, self.categories.index('tension')] = 0.3
+
+        return [dict(zip(self.categories, row)) for row in scores.tolist()]
+
+    def classify(self, description):
+        """Return normalized category scores for one description"""
+        return self.classify_many([description])[0]
+
+class AmbientSoundDesigner:
+    """Creates contextual ambient sound design for horror stories"""
+
+    def __init__(self, sound_library_path="sound_effects", sample_rate=24000, seed=None, sound_cache=None,
+                 index_path=None, keywords_path=None):
+        """Initialize with path to sound effect library and optional keyword config"""
+        self.sound_library_path = sound_library_path
+        self.sample_rate = sample_rate
+        self.sound_cache = sound_cache if sound_cache is not None else get_sound_cache()
+        self.sound_categories = SOUND_CATEGORIES
+        self.random = random.Random(seed)
+        if keywords_path:
+            self.scene_classifier = SceneClassifier.from_config(keywords_path, self.sound_categories)
+        else:
+            self.scene_classifier = SceneClassifier(SCENE_KEYWORDS, self.sound_categories)
+
+        # Create sound library directory if it doesn't exist
+        os.makedirs(self.sound_library_path, exist_ok=True)
+        self.library_index = SoundLibraryIndex(self.sound_library_path, self.sound_categories, index_path)
+
+    def analyze_scene(self, scene_description):
+        """Analyze scene description to determine appropriate sound categories and intensities"""
+        return self.scene_classifier.classify(scene_description)
+
+    def available_sounds(self):
+        """Map each category to the matching .wav files in the library index"""
+        self.library_index.refresh()
+        return {category: self.library_index.files(category) for category in self.sound_categories}
+
+    def select_sounds(self, scene_scores, duration, available=None):
+        """Select appropriate sound effects based on scene analysis"""
+        if available is None:
+            available = self.available_sounds()
+
+        selected_sounds = []
+        for category, score in scene_scores.items():
+            # Only use categories with significant scores
+            if score > 0.2 and available[category]:
+                num_sounds = int(score * 3)  # More sounds for higher scores
+                for _ in range(min(num_sounds, len(available[category]))):
+                    sound_file = self.random.choice(available[category])
+                    metadata = self.library_index.metadata(sound_file) or {}
+                    selected_sounds.append({
+                        'file': os.path.join(self.sound_library_path, sound_file),
+                        'volume': 0.3 + (score * 0.7),  # Volume based on score (0.3-1.0)
+                        'gain': self.library_index.staging_gain(sound_file),  # Loudness staging from the index
+                        'category': category,
+                        'loop': category in ['tension', 'outdoor'],  # Loop background sounds
+                        'loop_points': (metadata.get('loop_start'), metadata.get('loop_end')),
+                        'random_start': category != 'tension'  # Random start time for non-tension sounds
+                    })
+
+        return selected_sounds
+
+    def mix_sound(self, mixer, sound_info, source, start, length):
+        """Mix one selected sound into the scene span [start, start + length)"""
+        if sound_info['loop']:
+            # Loop between the indexed zero crossings instead of the raw file edges
+            loop_start, loop_end = sound_info.get('loop_points', (None, None))
+            if loop_start is not None and loop_end is not None:
+                loop_region = source[int(loop_start * self.sample_rate):int(loop_end * self.sample_rate)]
+                if len(loop_region):
+                    source = loop_region
+
+        source_length = len(source)
+        if source_length == 0:
+            return
+
+        offset = 0
+        if sound_info['loop']:
+            # Loops cover the whole scene, reading the source modulo its length
+            if sound_info['random_start']:
+                offset = self.random.randrange(source_length)
+            render_length = length
+        else:
+            # One-shots play once, from a random point when much longer than the scene
+            if sound_info['random_start'] and source_length > length * 1.5:
+                offset = self.random.randint(0, source_length - length)
+            render_length = min(length, source_length - offset)
+
+        # Fade in and out (except for tension beds)
+        fade = 0
+        if sound_info['category'] != 'tension':
+            fade = min(self.sample_rate, int(render_length * 0.2))
+
+        mixer.add(
+            source,
+            start,
+            render_length,
+            gain=volume_to_gain(sound_info['volume']) * sound_info.get('gain', 1.0),
+            offset=offset,
+            loop=sound_info['loop'],
+            fade=fade
+        )
+
+    def scene_intervals(self, scenes):
+        """Yield (start_ms, end_ms, description) from a Timeline or scene description dicts"""
+        if isinstance(scenes, Timeline):
+            for start_ms, end_ms, scene in scenes.scenes:
+                yield start_ms, end_ms, scene['description']
+        else:
+            for scene in scenes:
+                yield (subtitles.timestamp_to_ms(scene['start_time']),
+                       subtitles.timestamp_to_ms(scene['end_time']),
+                       scene['description'])
+
+    def create_ambient_mix(self, scenes, output_path, total_duration):
+        """Create a complete ambient sound mix for the entire story in one float32 buffer"""
+        total_samples = int(total_duration * self.sample_rate)
+        mixer = AccumulationMixer(total_samples)
+        available = self.available_sounds()
+
+        # Analyze every scene in one pass
+        intervals = list(self.scene_intervals(scenes))
+        all_scores = self.scene_classifier.classify_many([description for _, _, description in intervals])
+
+        for (start_ms, end_ms, _), scene_scores in zip(intervals, all_scores):
+            start = min(start_ms * self.sample_rate // 1000, total_samples)
+            end = min(end_ms * self.sample_rate // 1000, total_samples)
+            if end <= start:
+                continue
+
+            # Select sounds for the analyzed scene
+            selected_sounds = self.select_sounds(scene_scores, (end - start) / self.sample_rate, available)
+
+            # Mix sounds for this scene
+            for sound_info in selected_sounds:
+                try:
+                    source = self.sound_cache.get(sound_info['file'], self.sample_rate)
+                    self.mix_sound(mixer, sound_info, source, start, end - start)
+                except Exception as e:
+                    print(f"Error processing sound {sound_info['file']}: {str(e)}")
+
+        # Keep overlapping sounds from clipping
+        mixer.normalize_peak(1.0)
+
+        # Write the final mix in one pass
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        sf.write(output_path, mixer.buffer, self.sample_rate)
+        print(f"Ambient sound design created: {output_path}")
+
+        return output_path
@@ -0,0 +1,220 @@
+import struct
+import numpy as np
+import soundfile as sf
+
+# Default block length for streaming reads, in frames
+BLOCK_FRAMES = 1 << 18
+
+# WAVE_FORMAT_EXTENSIBLE SubFormat GUIDs carry the format tag in their first two bytes
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+KSDATAFORMAT_SUBTYPE_SUFFIX = b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+
+def audio_duration(path):
+    """Duration of an audio file in seconds, read from its header"""
+    info = sf.info(path)
+    return info.frames / info.samplerate
+
+def audio_info(path):
+    """Return (frames, sample_rate, channels) from the file header"""
+    info = sf.info(path)
+    return info.frames, info.samplerate, info.channels
+
+def wav_memmap(path):
+    """Map the PCM data of an uncompressed WAV file without reading it
+
+    Returns (samples, sample_rate) where samples is a read-only (frames, channels)
+    memmap. Only 16/32-bit integer and 32/64-bit float PCM are supported.
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError(f"Not a RIFF/WAVE file: {path}")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in {path}")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt_data = f.read(chunk_size)
+                fmt = struct.unpack('<HHIIHH', fmt_data[:16])
+                f.seek(chunk_size & 1, 1)
+            elif chunk_id == b'data':
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+    if fmt is None:
+        raise ValueError(f"No fmt chunk in {path}")
+    format_tag, channels, sample_rate, _, _, bits = fmt
+    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+        # The real sample format is the SubFormat GUID after cbSize, valid bits and channel mask
+        sub_format = fmt_data[24:40]
+        if len(sub_format) < 16 or sub_format[2:] != KSDATAFORMAT_SUBTYPE_SUFFIX:
+            raise ValueError(f"Unsupported WAVE_FORMAT_EXTENSIBLE sub-format in {path}")
+        format_tag = struct.unpack('<H', sub_format[:2])[0]
+    dtypes = {(1, 16): '<i2', (1, 32): '<i4', (3, 32): '<f4', (3, 64): '<f8'}
+    if (format_tag, bits) not in dtypes:
+        raise ValueError(f"Unsupported WAV sample format {format_tag}/{bits} bit in {path}")
+
+    frames = chunk_size // (channels * bits // 8)
+    samples = np.memmap(path, dtype=dtypes[(format_tag, bits)], mode='r', offset=data_offset,
+                        shape=(frames, channels))
+    return samples, sample_rate
+
+def _downmix(block):
+    """Average the channels of a (frames, channels) float32 block"""
+    channels = block.shape[1]
+    if channels == 1:
+        return block[:, 0]
+    return block @ np.full(channels, 1.0 / channels, dtype=np.float32)
+
+def _to_float(block):
+    """Convert integer PCM to float32 in [-1, 1)"""
+    if block.dtype.kind == 'i':
+        return block.astype(np.float32) / float(np.iinfo(block.dtype).max + 1)
+    return block.astype(np.float32, copy=False)
+
+def _raw_mono_blocks(path, block_frames):
+    """Yield mono float32 blocks at the file's own sample rate
+
+    Uncompressed WAV files are read through a memory map; everything else is decoded
+    with soundfile block reads.
+    """
+    try:
+        samples, _ = wav_memmap(path)
+    except (OSError, ValueError):
+        samples = None
+
+    if samples is not None:
+        for start in range(0, len(samples), block_frames):
+            yield _downmix(_to_float(samples[start:start + block_frames]))
+        return
+
+    for block in sf.blocks(path, blocksize=block_frames, dtype='float32', always_2d=True):
+        yield _downmix(block)
+
+def _resample_blocks(blocks, source_rate, target_rate, total_source_frames):
+    """Linearly resample a stream of blocks, matching services.ambient.resample"""
+    step = source_rate / target_rate
+    target_total = int(round(total_source_frames * target_rate / source_rate))
+    produced = 0
+    position = 0.0  # next output position, in source samples
+    offset = 0  # source index of carry[0]
+    carry = np.zeros(0, dtype=np.float32)
+
+    for block in blocks:
+        buffer = np.concatenate((carry, block))
+        last = offset + len(buffer) - 1
+        count = int(np.floor((last - position) / step)) + 1 if position <= last else 0
+        count = min(count, target_total - produced)
+        if count > 0:
+            positions = position + step * np.arange(count)
+            yield np.interp(positions - offset, np.arange(len(buffer)), buffer).astype(np.float32)
+            produced += count
+            position += step * count
+        keep = max(min(int(np.floor(position)) - offset, len(buffer) - 1), 0)
+        carry = buffer[keep:]
+        offset += keep
+
+    # Positions past the last input sample hold its value, as np.interp does
+    if produced < target_total and len(carry):
+        yield np.full(target_total - produced, carry[-1], dtype=np.float32)
+
+def _rechunk(blocks, block_frames):
+    """Regroup a stream of arrays into blocks of exactly block_frames (last may be shorter)"""
+    pending = []
+    pending_frames = 0
+    for block in blocks:
+        pending.append(block)
+        pending_frames += len(block)
+        while pending_frames >= block_frames:
+            joined = np.concatenate(pending)
+            yield joined[:block_frames]
+            pending = [joined[block_frames:]]
+            pending_frames = len(pending[0])
+    if pending_frames:
+        yield np.concatenate(pending)
+
+def iter_blocks(path, block_frames=BLOCK_FRAMES, sample_rate=None, length=None, loop=False,
+                max_loop_frames=BLOCK_FRAMES * 16):
+    """Stream a file as mono float32 blocks of block_frames, optionally resampled
+
+    With length set, exactly that many samples are produced: the file repeats when
+    loop is true and is padded with silence otherwise. Memory use is bounded by the
+    block size regardless of file length; looped files of at most max_loop_frames
+    are decoded once and repeated from memory instead of being decoded every cycle.
+    """
+    frames, source_rate, _ = audio_info(path)
+    sample_rate = sample_rate or source_rate
+    target_frames = int(round(frames * sample_rate / source_rate))
+
+    def decode_pass():
+        blocks = _raw_mono_blocks(path, block_frames)
+        if sample_rate != source_rate:
+            blocks = _resample_blocks(blocks, source_rate, sample_rate, frames)
+        return blocks
+
+    one_pass = decode_pass
+    if loop and length is not None and length > target_frames and 0 < target_frames <= max_loop_frames:
+        decoded = np.concatenate(list(decode_pass()))
+
+        def one_pass():
+            return (decoded[start:start + block_frames] for start in range(0, len(decoded), block_frames))
+
+    def stream():
+        produced = 0
+        while True:
+            empty = True
+            for block in one_pass():
+                empty = False
+                if length is not None:
+                    block = block[:length - produced]
+                produced += len(block)
+                yield block
+                if length is not None and produced >= length:
+                    return
+            if length is None or empty or not loop:
+                break
+        if length is not None and produced < length:
+            for start in range(produced, length, block_frames):
+                yield np.zeros(min(block_frames, length - start), dtype=np.float32)
+
+    return _rechunk(stream(), block_frames)
+
+def block_rms_envelope(path, frame_length, block_frames=BLOCK_FRAMES):
+    """Per-frame RMS of a file computed block by block (trailing partial frame included)"""
+    block_frames = max(block_frames // frame_length, 1) * frame_length
+    envelopes = []
+    for block in iter_blocks(path, block_frames):
+        frames = len(block) // frame_length
+        whole = block[:frames * frame_length].reshape(frames, frame_length)
+        envelope = np.sqrt(np.einsum('ij,ij->i', whole, whole, dtype=np.float64) / frame_length)
+        remainder = block[frames * frame_length:]
+        if len(remainder):
+            envelope = np.append(envelope, np.sqrt(np.mean(np.square(remainder, dtype=np.float64))))
+        envelopes.append(envelope)
+    return np.concatenate(envelopes) if envelopes else np.zeros(0)
+
+class BlockWriter:
+    """Writes mono float32 blocks to a sound file as they are produced"""
+
+    def __init__(self, path, sample_rate, subtype='PCM_16'):
+        """Open path for writing"""
+        self.file = sf.SoundFile(path, 'w', samplerate=sample_rate, channels=1, subtype=subtype)
+
+    def write(self, block):
+        """Append one block"""
+        self.file.write(block)
+
+    def close(self):
+        """Finish the file"""
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,20 +1,42 @@
 import os
 import numpy as np
 import soundfile as sf
-import whisper
 import datetime
+from services.speech_recognition import create_asr_backend, transcribe_chunked
+from services import subtitles
+from services.ambient import AmbientSoundDesigner
 
 class AudioService:
     """Service for audio generation and processing"""
     
-    def __init__(self):
+    def __init__(self, asr_backend="auto", asr_model_size="base"):
         """Initialize audio service"""
         # Create output directories
         os.makedirs("output/audio", exist_ok=True)
         os.makedirs("output/subtitles", exist_ok=True)
         
-        # Initialize whisper model (lazy loading)
-        self.whisper_model = None
+        # Speech recognition settings ("auto" picks faster-whisper on CPU-only hosts)
+        self.asr_backend_name = asr_backend
+        self.asr_model_size = asr_model_size
+        
+        # Initialize speech recognition backend (lazy loading)
+        self.asr_backend = None
+        
+        # Ambient sound designer (created on first use)
+        self.ambient_designer = None
+    
+    def get_asr_backend(self):
+        """Return the speech recognition backend, creating it on first use"""
+        if self.asr_backend is None:
+            self.asr_backend = create_asr_backend(self.asr_backend_name, self.asr_model_size)
+        return self.asr_backend
+    
+    def set_asr_backend(self, backend="auto", model_size="base"):
+        """Select the speech recognition backend and model size"""
+        if backend != self.asr_backend_name or model_size != self.asr_model_size:
+            self.asr_backend_name = backend
+            self.asr_model_size = model_size
+            self.asr_backend = None
     
     def generate_narration(self, script_text, voice="af_bella", speed=0.85):
         """Generate professional horror narration audio"""
@@ -43,115 +65,68 @@ class AudioService:
             print("Kokoro TTS not available. Please install it first.")
             return None
     
-    def generate_subtitles(self, audio_path):
-        """Generate subtitles using Whisper model"""
+    def generate_subtitles(self, audio_path, chunked=False, workers=None, chunk_seconds=120.0):
+        """Generate subtitles using the configured speech recognition backend
+        
+        With chunked=True the narration is split at silences into overlapping windows
+        that are transcribed in parallel worker processes, each with its own model.
+        """
         if not os.path.exists(audio_path):
             print(f"Audio file not found: {audio_path}")
             return None
         
-        # Lazy load Whisper model
-        if self.whisper_model is None:
-            self.whisper_model = whisper.load_model("base")
-        
-        # Transcribe with timing info
-        result = self.whisper_model.transcribe(
-            audio_path,
-            verbose=False,
-            word_timestamps=True,
-            fp16=False  # Set to True if GPU available
-        )
+        if chunked:
+            # Parallel transcription of silence-aligned windows
+            segments = transcribe_chunked(
+                audio_path,
+                backend_name=self.asr_backend_name,
+                model_size=self.asr_model_size,
+                workers=workers,
+                chunk_seconds=chunk_seconds
+            )
+        else:
+            # Lazy load speech recognition backend
+            backend = self.get_asr_backend()
+            
+            # Transcribe with timing info
+            audio = backend.load_audio(audio_path)
+            segments = backend.transcribe(audio)
         
         # Save SRT file
         srt_path = os.path.join("output/subtitles", "subtitles.srt")
         with open(srt_path, "w", encoding="utf-8") as srt_file:
-            self.write_srt(result["segments"], srt_file)
+            self.write_srt(segments, srt_file)
         
         return srt_path
     
     def write_srt(self, segments, file):
         """Write SRT file from segments"""
-        for i, segment in enumerate(segments, start=1):
-            # Write segment number
-            print(f"{i}", file=file)
-            
-            # Format timestamps (SRT format: HH:MM:SS,mmm)
-            start = self.format_timestamp(segment["start"])
-            end = self.format_timestamp(segment["end"])
-            
-            # Write timestamps
-            print(f"{start} --> {end}", file=file)
-            
-            # Write text
-            print(f"{segment['text'].strip()}", file=file)
-            
-            # Empty line between entries
-            print("", file=file)
+        subtitles.write_srt(subtitles.cues_from_segments(segments), file)
     
     def format_timestamp(self, seconds):
         """Format seconds to SRT timestamp format (HH:MM:SS,mmm)"""
-        milliseconds = int((seconds % 1) * 1000)
-        hours, remainder = divmod(int(seconds), 3600)
-        minutes, seconds = divmod(remainder, 60)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+        return subtitles.ms_to_timestamp(subtitles.seconds_to_ms(seconds))
     
     def parse_srt_timestamps(self, srt_path):
         """Parse SRT file and extract timestamps with text"""
         if not os.path.exists(srt_path):
             print(f"SRT file not found: {srt_path}")
             return []
-            
-        segments = []
-        current_segment = {}
         
-        with open(srt_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-            
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            if line.isdigit():  # Segment number
-                if current_segment:
-                    segments.append(current_segment)
-                    current_segment = {}
-                
-                i += 1
-                # Parse timestamp line
-                timestamp_line = lines[i].strip()
-                start_time, end_time = timestamp_line.split(' --> ')
-                
-                i += 1
-                # Get text (may be multiple lines)
-                text = []
-                while i < len(lines) and lines[i].strip():
-                    text.append(lines[i].strip())
-                    i += 1
-                    
-                current_segment = {
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'text': ' '.join(text)
-                }
-            i += 1
-            
-        if current_segment:
-            segments.append(current_segment)
-            
-        return segments
+        return subtitles.cues_to_segments(subtitles.read_subtitles(srt_path))
     
-    def generate_ambient_soundscape(self, scene_descriptions, audio_duration):
-        """Generate ambient sound design based on scene descriptions"""
-        # This is a placeholder for the ambient sound generation
-        # In a real implementation, this would create a dynamic soundscape
-        # based on the scene descriptions
-        
-        # For now, we'll just return a path to a dummy ambient sound file
-        output_path = os.path.join("output/audio", "ambient_soundscape.wav")
+    def generate_ambient_soundscape(self, scene_descriptions, audio_duration, narration_path=None):
+        """Generate ambient sound design based on scene descriptions or a Timeline
         
-        # Create a silent audio file as a placeholder
+        The mix is rendered at the narration's sample rate when narration_path is given.
+        """
         sample_rate = 24000
-        duration_samples = int(audio_duration * sample_rate)
-        silent_audio = np.zeros(duration_samples)
-        sf.write(output_path, silent_audio, sample_rate)
+        if narration_path and os.path.exists(narration_path):
+            sample_rate = sf.info(narration_path).samplerate
         
-        return output_path 
\ No newline at end of file
+        # Reuse the designer between stories
+        if self.ambient_designer is None or self.ambient_designer.sample_rate != sample_rate:
+            self.ambient_designer = AmbientSoundDesigner(sample_rate=sample_rate)
+        
+        output_path = os.path.join("output/audio", "ambient_soundscape.wav")
+        return self.ambient_designer.create_ambient_mix(scene_descriptions, output_path, audio_duration)
@@ -0,0 +1,215 @@
+import os
+import time
+import shutil
+import hashlib
+import threading
+import subprocess
+from concurrent.futures import Future, ThreadPoolExecutor
+from services.file_utils import file_sha1
+
+# Compressed deliverables, tuned for spoken word
+ENCODING_PROFILES = {
+    'opus': {'extension': 'opus', 'args': ['-c:a', 'libopus', '-b:a', '64k', '-application', 'audio']},
+    'mp3': {'extension': 'mp3', 'args': ['-c:a', 'libmp3lame', '-b:a', '128k', '-id3v2_version', '3']},
+    'aac': {'extension': 'm4a', 'args': ['-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart']}
+}
+
+# Default cache size before least recently used encodes are evicted
+MAX_ENCODE_CACHE_BYTES = 2 << 30
+
+# File extensions mapped to profile names
+EXTENSION_PROFILES = {profile['extension']: name for name, profile in ENCODING_PROFILES.items()}
+
+# The AAC profile writes an MP4 container, which raw .aac (ADTS) readers cannot decode
+CONTAINER_EXTENSIONS = {'aac': 'm4a'}
+
+# File dialog filter for audio exports
+AUDIO_EXPORT_FILTER = "Opus Audio (*.opus);;MP3 Audio (*.mp3);;AAC Audio (*.m4a);;WAV Files (*.wav)"
+
+def with_filter_extension(path, selected_filter):
+    """Append the extension of the selected dialog filter when path has none
+
+    Extensions that misname the container written (.aac) are replaced.
+    """
+    base, extension = os.path.splitext(path)
+    if extension.lower().lstrip('.') in CONTAINER_EXTENSIONS:
+        return f"{base}.{CONTAINER_EXTENSIONS[extension.lower().lstrip('.')]}"
+    if extension or '*.' not in selected_filter:
+        return path
+    return path + '.' + selected_filter.split('*.')[1].rstrip(')').split()[0]
+
+def get_ffmpeg_binary():
+    """Return the ffmpeg executable moviepy is configured to use"""
+    try:
+        from moviepy.config import get_setting
+        return get_setting("FFMPEG_BINARY")
+    except Exception:
+        return "ffmpeg"
+
+def encode_file(source_path, output_path, profile_name, metadata_path=None):
+    """Encode source_path with one profile, optionally taking tags and chapters from an FFMETADATA file"""
+    command = [get_ffmpeg_binary(), '-y', '-loglevel', 'error', '-i', source_path]
+    if metadata_path:
+        command += ['-i', metadata_path, '-map', '0:a', '-map_metadata', '1', '-map_chapters', '1']
+    command += ENCODING_PROFILES[profile_name]['args'] + [output_path]
+    subprocess.run(command, check=True, capture_output=True)
+    return output_path
+
+class EncodingService:
+    """Service for compressed audio deliverables
+
+    Each encode runs as its own ffmpeg process, several at a time, and results are
+    stored in a content-addressed cache keyed by the source audio, profile and
+    metadata, so repeated exports of the same narration are plain file copies. The
+    least recently used encodes are evicted when the cache grows past max_bytes.
+    Use close() or a with block to stop the encoder threads.
+    """
+
+    def __init__(self, cache_dir="output/encodes", max_workers=None, max_bytes=MAX_ENCODE_CACHE_BYTES):
+        """Initialize encoding service"""
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or min(len(ENCODING_PROFILES), os.cpu_count() or 1))
+        self.running = {}
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self, wait=True):
+        """Stop the encoder threads, by default after running encodes finish"""
+        self.executor.shutdown(wait=wait)
+
+    def cached_path(self, source_path, profile_name, metadata_path=None, digests=None):
+        """Cache location of an encode of source_path
+
+        digests, as returned by content_digests, saves hashing the files again.
+        """
+        source_digest, metadata_digest = digests or self.content_digests(source_path, metadata_path)
+        digest = hashlib.sha1(source_digest.encode('utf-8'))
+        digest.update(' '.join(ENCODING_PROFILES[profile_name]['args']).encode('utf-8'))
+        if metadata_digest:
+            digest.update(metadata_digest.encode('utf-8'))
+        extension = ENCODING_PROFILES[profile_name]['extension']
+        return os.path.join(self.cache_dir, f"{digest.hexdigest()}.{extension}")
+
+    def content_digests(self, source_path, metadata_path=None):
+        """Digests of the source audio and the optional metadata file"""
+        return file_sha1(source_path), file_sha1(metadata_path) if metadata_path else None
+
+    def _touch(self, cache_path):
+        """Mark a cached encode as recently used"""
+        now = time.time()
+        os.utime(cache_path, (now, now))
+
+    def _evict(self, keep):
+        """Delete least recently used encodes until the cache fits max_bytes
+
+        keep and encodes still running are never deleted, so the cache can exceed
+        max_bytes by the encodes in progress.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if '.tmp.' in name or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep or path in self.running:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def _encode_to_cache(self, source_path, cache_path, profile_name, metadata_path):
+        """Encode into a temporary file and move it into the cache"""
+        extension = ENCODING_PROFILES[profile_name]['extension']
+        temp_path = f"{cache_path[:-len(extension) - 1]}.{os.getpid()}.tmp.{extension}"
+        try:
+            encode_file(source_path, temp_path, profile_name, metadata_path)
+            os.replace(temp_path, cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return cache_path
+
+    def _cached_encode(self, source_path, profile_name, metadata_path, digests):
+        """Encoder thread task: cache path of an encode, encoding it unless cached or already running"""
+        cache_path = self.cached_path(source_path, profile_name, metadata_path, digests.result())
+        with self.lock:
+            running = self.running.get(cache_path)
+            owner = running is None
+            if owner:
+                if os.path.exists(cache_path):
+                    # Cache hits count as uses for eviction
+                    self._touch(cache_path)
+                    return cache_path
+                running = self.running[cache_path] = Future()
+                self._evict(cache_path)
+
+        # The same encode requested again waits for the thread already running it
+        if not owner:
+            return running.result()
+        try:
+            self._encode_to_cache(source_path, cache_path, profile_name, metadata_path)
+            running.set_result(cache_path)
+        except Exception as e:
+            running.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.running[cache_path]
+        return cache_path
+
+    def start_encodes(self, source_path, profiles=tuple(ENCODING_PROFILES), metadata_path=None):
+        """Start encoding source_path to every profile in the background
+
+        Only submits work, so it is safe to call from the GUI thread: hashing, cache
+        lookups and encodes all run on the encoder threads. Returns {profile: future}.
+        """
+        # The source is hashed once for all profiles; the pool starts tasks in order,
+        # so the digest task is running before any task waits on it
+        digests = self.executor.submit(self.content_digests, source_path, metadata_path)
+        return {
+            profile_name: self.executor.submit(self._cached_encode, source_path, profile_name, metadata_path, digests)
+            for profile_name in profiles
+        }
+
+    def encode_all(self, source_path, profiles=tuple(ENCODING_PROFILES), metadata_path=None):
+        """Encode source_path to every profile in parallel and return {profile: cached path}"""
+        futures = self.start_encodes(source_path, profiles, metadata_path)
+        results = {}
+        for profile_name, future in futures.items():
+            try:
+                results[profile_name] = future.result()
+            except Exception as e:
+                print(f"Error encoding {profile_name}: {str(e)}")
+        return results
+
+    def export(self, source_path, export_path, metadata_path=None):
+        """Write source_path to export_path in the format its extension names
+
+        WAV exports are copied as they are; compressed formats come from the cache.
+        """
+        extension = os.path.splitext(export_path)[1].lower().lstrip('.')
+        if extension == 'wav':
+            shutil.copy2(source_path, export_path)
+            return export_path
+        if extension not in EXTENSION_PROFILES:
+            raise ValueError(f"Unsupported audio export format: .{extension}")
+
+        profile_name = EXTENSION_PROFILES[extension]
+        cache_path = self.start_encodes(source_path, (profile_name,), metadata_path)[profile_name].result()
+        shutil.copy2(cache_path, export_path)
+        return export_path
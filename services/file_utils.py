@@ -0,0 +1,34 @@
+import os
+import json
+import hashlib
+import threading
+
+def safe_slug(title, default="story"):
+    """File name stem for a title: letters, digits, '-' and '_', other characters as '_'"""
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in title).strip("_") or default
+
+def file_sha1(path, chunk_size=1 << 20):
+    """SHA-1 of a file's contents, read in chunks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_json(path, version=None):
+    """Parsed JSON object at path, or None when unreadable or of another version"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or (version is not None and data.get('version') != version):
+        return None
+    return data
+
+def save_json_atomic(path, data):
+    """Write data as JSON through a temporary file, so readers never see a partial file"""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(temp_path, path)
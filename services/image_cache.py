@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from services.file_utils import file_sha1, load_json, save_json_atomic
+
+# Default cache size before least recently used images are evicted
+MAX_CACHE_BYTES = 4 << 30
+
+def generation_key(params):
+    """Stable key of a dict of generation parameters"""
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+class ImageCache:
+    """Content-addressed store of generated images
+
+    Keys are hashes of every parameter that determines an image (model, scheduler,
+    prompts, seed, steps, guidance and resolution). Image files are stored once per
+    distinct content, so identical results under different keys share storage, and
+    the least recently used keys are evicted when the cache grows past max_bytes.
+    """
+
+    VERSION = 2
+
+    def __init__(self, cache_dir="output/image_cache", max_bytes=MAX_CACHE_BYTES):
+        """Open or create the cache in cache_dir"""
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.max_bytes = max_bytes
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.keys = {}
+        self.blobs = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Read the persisted index, ignoring unreadable or outdated files"""
+        data = load_json(self.index_path, self.VERSION)
+        if data is None:
+            return
+        self.keys = data.get('keys', {})
+        self.blobs = data.get('blobs', {})
+
+    def _save(self):
+        """Write the index atomically"""
+        save_json_atomic(self.index_path, {'version': self.VERSION, 'keys': self.keys, 'blobs': self.blobs})
+        self.dirty = False
+
+    def _blob_path(self, blob):
+        """File holding a stored image, named by content digest and extension"""
+        return os.path.join(self.blob_dir, blob)
+
+    def _evict(self):
+        """Drop least recently used keys until stored images fit max_bytes"""
+        total = sum(self.blobs.values())
+        for key in sorted(self.keys, key=lambda k: self.keys[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            blob = self.keys.pop(key)['blob']
+            if not any(entry['blob'] == blob for entry in self.keys.values()):
+                total -= self.blobs.pop(blob, 0)
+                if os.path.exists(self._blob_path(blob)):
+                    os.remove(self._blob_path(blob))
+
+    @property
+    def size_bytes(self):
+        """Bytes of image data stored"""
+        return sum(self.blobs.values())
+
+    def get(self, params):
+        """Path of the cached image for params, or None"""
+        key = generation_key(params)
+        with self.lock:
+            entry = self.keys.get(key)
+            if entry is None:
+                return None
+            path = self._blob_path(entry['blob'])
+            if not os.path.exists(path):
+                del self.keys[key]
+                self.dirty = True
+                return None
+            entry['last_used'] = time.time()
+            self.dirty = True
+            return path
+
+    def fetch(self, params, output_path):
+        """Copy the cached image for params to output_path; returns output_path or None"""
+        path = self.get(params)
+        if path is None:
+            return None
+        shutil.copyfile(path, output_path)
+        return output_path
+
+    def put(self, params, image_path):
+        """Store a saved image file under params and return its cache path"""
+        blob = file_sha1(image_path) + os.path.splitext(image_path)[1]
+        path = self._blob_path(blob)
+
+        with self.lock:
+            if blob not in self.blobs or not os.path.exists(path):
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.copyfile(image_path, temp_path)
+                os.replace(temp_path, path)
+                self.blobs[blob] = os.path.getsize(path)
+            self.keys[generation_key(params)] = {'blob': blob, 'last_used': time.time()}
+            self._evict()
+            self._save()
+        return path
+
+    def flush(self):
+        """Persist recency updates from cache hits"""
+        with self.lock:
+            if self.dirty:
+                self._save()
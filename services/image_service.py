@@ -1,28 +1,250 @@
 import os
 import torch
 import time
+import uuid
 import random
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
 from PIL import Image
+from services.file_utils import file_sha1, load_json, save_json_atomic
+from services.image_cache import ImageCache, generation_key
+from services.image_writer import ImageWriter
+from services.image_workers import ImageWorkerPool
+from services.prompt_similarity import find_near_duplicates, vary_image
+from services.upscaler import upscale_files
+
+# Shared negative prompt for every generation
+NEGATIVE_PROMPT = (
+    "low quality, blurry, distorted, deformed, disfigured, bad anatomy, "
+    "bad proportions, extra limbs, missing limbs, disconnected limbs, "
+    "duplicate, mutated, ugly, watermark, watermarked, text, signature, "
+    "logo, oversaturated, cartoon, 3d render, bad art, amateur, "
+    "poorly drawn face, poorly drawn hands, poorly drawn feet"
+)
+
+# Sampling modes: model, scheduler, step count and matching guidance
+GENERATION_MODES = {
+    'quality': {
+        'model': "stabilityai/stable-diffusion-xl-base-1.0",
+        'scheduler': 'dpm_sde_karras',
+        'steps': 40,
+        'guidance': 7.5
+    },
+    'fast': {
+        'model': "stabilityai/stable-diffusion-xl-base-1.0",
+        'scheduler': 'dpm_2m_karras',
+        'steps': 12,
+        'guidance': 6.0
+    },
+    'lcm': {
+        'model': "stabilityai/stable-diffusion-xl-base-1.0",
+        'lora': "latent-consistency/lcm-lora-sdxl",
+        'scheduler': 'lcm',
+        'steps': 6,
+        'guidance': 1.5
+    },
+    'turbo': {
+        'model': "stabilityai/sdxl-turbo",
+        'scheduler': 'euler_a_trailing',
+        'steps': 2,
+        'guidance': 0.0
+    }
+}
+
+# Prompt embeddings kept per unique text
+MAX_CACHED_EMBEDDINGS = 512
+
+# Progressive previews: step count and tiny SDXL decoder
+PREVIEW_STEPS = 8
+PREVIEW_DECODER = "madebyollin/taesdxl"
+
+def default_generation_mode():
+    """Full-quality sampling unless IMAGE_GENERATION_MODE names another mode
+
+    Faster modes change the model or the look of the images, so they are only used
+    when picked in the UI or through the environment variable.
+    """
+    mode = os.environ.get("IMAGE_GENERATION_MODE", "quality")
+    if mode not in GENERATION_MODES:
+        print(f"Unknown IMAGE_GENERATION_MODE '{mode}', using 'quality'")
+        return 'quality'
+    return mode
+
+def create_scheduler(name, config):
+    """Build a diffusers scheduler from a GENERATION_MODES scheduler name"""
+    from diffusers import DPMSolverMultistepScheduler, EulerAncestralDiscreteScheduler
+    if name == 'dpm_sde_karras':
+        return DPMSolverMultistepScheduler.from_config(config, algorithm_type="sde-dpmsolver++", use_karras_sigmas=True)
+    if name == 'dpm_2m_karras':
+        return DPMSolverMultistepScheduler.from_config(config, algorithm_type="dpmsolver++", use_karras_sigmas=True)
+    if name == 'euler_a_trailing':
+        return EulerAncestralDiscreteScheduler.from_config(config, timestep_spacing="trailing")
+    if name == 'lcm':
+        # LCMScheduler ships with diffusers 0.22 and later
+        from diffusers import LCMScheduler
+        return LCMScheduler.from_config(config)
+    raise ValueError(f"Unknown scheduler: {name}")
+
+def scene_seed(project, scene_index):
+    """Deterministic seed of one scene of a project"""
+    digest = hashlib.sha1(f"{project}:{scene_index}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % 2147483647 + 1
+
+class GenerationManifest:
+    """Record of a project's scene images, written as each image completes
+    
+    Each scene entry holds its generation key, seed, status and the hash of the saved
+    file, so an interrupted run can skip scenes that finished with the same parameters.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, path, project=None):
+        """Load the manifest at path, starting a new one when it belongs to another project"""
+        self.path = path
+        self.project = project
+        self.scenes = {}
+        self.lock = threading.Lock()
+        self._load()
+        if self.project is None:
+            self.project = uuid.uuid4().hex
+    
+    def _load(self):
+        """Read the persisted manifest, ignoring unreadable, outdated or foreign files"""
+        data = load_json(self.path, self.VERSION)
+        if data is None:
+            return
+        if self.project is not None and data.get('project') != self.project:
+            return
+        self.project = data.get('project')
+        self.scenes = data.get('scenes', {})
+    
+    def _save(self):
+        """Write the manifest atomically"""
+        save_json_atomic(self.path, {'version': self.VERSION, 'project': self.project, 'scenes': self.scenes})
+    
+    def seed(self, scene_index):
+        """Seed of a scene in this project"""
+        return scene_seed(self.project, scene_index)
+    
+    def is_complete(self, scene_index, key, path):
+        """Whether the scene finished with these parameters and its file is unchanged"""
+        entry = self.scenes.get(str(scene_index))
+        return bool(
+            entry and entry['status'] == 'done' and entry['key'] == key and entry['path'] == path
+            and os.path.exists(path) and file_sha1(path) == entry['sha1']
+        )
+    
+    def record(self, scene_index, key, seed, path=None, error=None):
+        """Record a finished or failed scene and persist the manifest"""
+        entry = {
+            'status': 'failed' if path is None else 'done',
+            'key': key,
+            'seed': seed,
+            'path': path,
+            'sha1': file_sha1(path) if path else None,
+            'error': error
+        }
+        with self.lock:
+            self.scenes[str(scene_index)] = entry
+            self._save()
+
+class RenderOptions:
+    """How generate_story_images renders the scenes it cannot take from the manifest or cache
+    
+    With workers above one, scenes are rendered by a pool of pinned worker processes.
+    Otherwise they are rendered in this process, and in progressive mode each scene
+    first gets a quick preview passed to on_preview(scene_index, path); scenes for
+    which should_refine(scene_index) is false are not refined. on_image(scene_index,
+    path) is called as each final image is written.
+    """
+    
+    def __init__(self, workers=None, progressive=False, on_preview=None, on_image=None, should_refine=None):
+        """Store the options; previews cannot be combined with workers"""
+        if progressive and workers and workers > 1:
+            raise ValueError("Progressive previews cannot be combined with worker processes")
+        self.workers = workers
+        self.progressive = progressive
+        self.on_preview = on_preview
+        self.on_image = on_image
+        self.should_refine = should_refine
+    
+    @property
+    def uses_workers(self):
+        """Whether scenes go to the worker pool"""
+        return bool(self.workers and self.workers > 1)
 
 class ImageService:
     """Service for generating images using Stable Diffusion"""
     
-    def __init__(self):
-        """Initialize image service"""
+    def __init__(self, mode=None, image_cache=None, image_writer=None):
+        """Initialize image service in a GENERATION_MODES sampling mode"""
         # Create output directory
         os.makedirs("output/images", exist_ok=True)
         
         # Initialize Stable Diffusion (lazy loading)
         self.sd_pipeline = None
+        self.mode = None
+        self.settings = None
+        self.set_mode(mode or default_generation_mode())
+        
+        # Text encoder outputs per unique prompt text, in least recently used order
+        self.embedding_cache = OrderedDict()
+        
+        # Probed batch sizes per resolution
+        self.batch_sizes = {}
+        
+        # Generated images keyed by their full generation parameters
+        self.image_cache = image_cache if image_cache is not None else ImageCache()
+        
+        # Scene images are encoded and written in the background
+        self.image_writer = image_writer if image_writer is not None else ImageWriter()
+        
+        # Multi-process worker pool, started on demand
+        self.worker_pool = None
+        
+        # Tiny VAE for previews, loaded on demand
+        self.preview_decoder = None
+        
+        # Seconds spent per stage by the last generate_story_images call
+        self.last_timings = {}
+    
+    def close(self):
+        """Stop the worker pool and release the pipelines its processes hold"""
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+        self.image_cache.flush()
+    
+    def set_mode(self, mode):
+        """Switch sampling mode, reloading the pipeline only when the model changes"""
+        if mode not in GENERATION_MODES:
+            raise ValueError(f"Unknown generation mode: {mode}")
+        if mode == self.mode:
+            return
+        previous = self.settings
+        self.mode = mode
+        self.settings = GENERATION_MODES[mode]
+        if self.sd_pipeline is None:
+            return
+        if previous['model'] != self.settings['model'] or previous.get('lora') != self.settings.get('lora'):
+            self.sd_pipeline = None
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        else:
+            self.sd_pipeline.scheduler = create_scheduler(self.settings['scheduler'], self.sd_pipeline.scheduler.config)
+            self.batch_sizes = {}
     
     def initialize_stable_diffusion(self):
-        """Initialize Stable Diffusion XL pipeline"""
+        """Initialize the Stable Diffusion XL pipeline of the current mode"""
         try:
-            from diffusers import StableDiffusionXLPipeline, DPMSolverMultistepScheduler
+            from diffusers import StableDiffusionXLPipeline
             
             # Load SDXL model
             self.sd_pipeline = StableDiffusionXLPipeline.from_pretrained(
-                "stabilityai/stable-diffusion-xl-base-1.0",
+                self.settings['model'],
                 torch_dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
                 variant="fp16" if torch.cuda.is_available() else None,
                 use_safetensors=True
@@ -32,19 +254,40 @@ class ImageService:
             if torch.cuda.is_available():
                 self.sd_pipeline = self.sd_pipeline.to("cuda")
             
-            # Set optimal scheduler
-            self.sd_pipeline.scheduler = DPMSolverMultistepScheduler.from_config(
-                self.sd_pipeline.scheduler.config,
-                algorithm_type="sde-dpmsolver++",
-                use_karras_sigmas=True
-            )
+            # Distilled few-step weights
+            if self.settings.get('lora'):
+                self.sd_pipeline.load_lora_weights(self.settings['lora'])
+                self.sd_pipeline.fuse_lora()
+            
+            # Set the mode's scheduler
+            self.sd_pipeline.scheduler = create_scheduler(self.settings['scheduler'], self.sd_pipeline.scheduler.config)
+            self.embedding_cache.clear()
+            self.preview_decoder = None
+            self.batch_sizes = {}
             
             return True
-        except ImportError:
-            print("Diffusers library not available. Please install it first.")
+        except ImportError as e:
+            print(f"Diffusers library not available or too old for '{self.mode}' mode: {str(e)}")
+            self.sd_pipeline = None
             return False
     
-    def generate_image(self, prompt, width=1024, height=680):
+    def generation_params(self, prompt, seed, width=1024, height=680):
+        """Every parameter that determines an image, used as its cache key"""
+        return {
+            'model': self.settings['model'],
+            'lora': self.settings.get('lora'),
+            'scheduler': self.settings['scheduler'],
+            'prompt': prompt,
+            'negative_prompt': NEGATIVE_PROMPT if self.settings['guidance'] > 1 else "",
+            'seed': seed,
+            'steps': self.settings['steps'],
+            'guidance': self.settings['guidance'],
+            'width': width,
+            'height': height,
+            'output': self.image_writer.options
+        }
+    
+    def generate_image(self, prompt, width=1024, height=680, seed=None):
         """Generate a single image using Stable Diffusion"""
         # Initialize SD if not already done
         if self.sd_pipeline is None:
@@ -52,28 +295,19 @@ class ImageService:
             if not success:
                 return None
         
-        # Create a more refined negative prompt based on best practices
-        negative_prompt = (
-            "low quality, blurry, distorted, deformed, disfigured, bad anatomy, "
-            "bad proportions, extra limbs, missing limbs, disconnected limbs, "
-            "duplicate, mutated, ugly, watermark, watermarked, text, signature, "
-            "logo, oversaturated, cartoon, 3d render, bad art, amateur, "
-            "poorly drawn face, poorly drawn hands, poorly drawn feet"
-        )
-        
         # Generate a random seed for variety but allow reproducibility
-        seed = random.randint(1, 2147483647)
-        torch_generator = torch.Generator(device="cuda" if torch.cuda.is_available() else "cpu").manual_seed(seed)
+        if seed is None:
+            seed = random.randint(1, 2147483647)
+        torch_generator = torch.Generator(device="cpu").manual_seed(seed)
         
         # Generate image
         try:
             image = self.sd_pipeline(
-                prompt=prompt,
-                negative_prompt=negative_prompt,
+                **self.embedding_kwargs([prompt]),
                 width=width,
                 height=height,
-                num_inference_steps=40,     # Higher step count for better quality
-                guidance_scale=7.5,         # Optimal CFG value for SDXL
+                num_inference_steps=self.settings['steps'],
+                guidance_scale=self.settings['guidance'],
                 generator=torch_generator,
                 output_type="pil"
             ).images[0]
@@ -83,34 +317,395 @@ class ImageService:
             print(f"Error generating image: {str(e)}")
             return None, None
     
-    def generate_story_images(self, image_prompts):
-        """Generate images for all prompts"""
-        image_paths = []
+    def encode_prompts(self, texts):
+        """Return batched (sequence embeds, pooled embeds) for texts
+        
+        Both SDXL text encoders run once per unique text; later requests for the same
+        text, such as the shared negative prompt or a re-rolled scene, come from the
+        embedding cache. Missing texts are encoded together in one call.
+        """
+        missing = list(OrderedDict.fromkeys(text for text in texts if text not in self.embedding_cache))
+        if missing:
+            with torch.no_grad():
+                embeds, _, pooled, _ = self.sd_pipeline.encode_prompt(
+                    prompt=missing,
+                    device=self.sd_pipeline.device,
+                    num_images_per_prompt=1,
+                    do_classifier_free_guidance=False
+                )
+            for index, text in enumerate(missing):
+                self.embedding_cache[text] = (embeds[index:index + 1], pooled[index:index + 1])
         
+        for text in texts:
+            self.embedding_cache.move_to_end(text)
+        entries = [self.embedding_cache[text] for text in texts]
+        while len(self.embedding_cache) > max(MAX_CACHED_EMBEDDINGS, len(texts) + 1):
+            self.embedding_cache.popitem(last=False)
+        return torch.cat([embeds for embeds, _ in entries]), torch.cat([pooled for _, pooled in entries])
+    
+    def embedding_kwargs(self, prompts):
+        """Pipeline arguments carrying precomputed prompt and negative prompt embeddings"""
+        prompt_embeds, pooled_embeds = self.encode_prompts(prompts)
+        kwargs = {'prompt_embeds': prompt_embeds, 'pooled_prompt_embeds': pooled_embeds}
+        
+        # Modes without classifier-free guidance never use the negative prompt
+        if self.settings['guidance'] > 1:
+            negative_embeds, negative_pooled = self.encode_prompts([NEGATIVE_PROMPT])
+            kwargs['negative_prompt_embeds'] = negative_embeds.expand(len(prompts), -1, -1)
+            kwargs['negative_pooled_prompt_embeds'] = negative_pooled.expand(len(prompts), -1)
+        return kwargs
+    
+    def probe_batch_size(self, width=1024, height=680, max_batch_size=8, headroom=0.85):
+        """Pick a batch size from the memory one image needs
+        
+        Runs a single-step generation at batch size one, measures the peak CUDA memory
+        it adds and fits as many images as the free memory allows. CPU runs use one.
+        """
+        key = (width, height)
+        if key in self.batch_sizes:
+            return self.batch_sizes[key]
+        if not torch.cuda.is_available():
+            self.batch_sizes[key] = 1
+            return 1
+        
+        try:
+            torch.cuda.empty_cache()
+            baseline = torch.cuda.memory_allocated()
+            torch.cuda.reset_peak_memory_stats()
+            self.sd_pipeline(
+                prompt="probe",
+                width=width,
+                height=height,
+                num_inference_steps=1,
+                guidance_scale=self.settings['guidance'],
+                output_type="latent"
+            )
+            per_image = max(torch.cuda.max_memory_allocated() - baseline, 1)
+            free_memory, _ = torch.cuda.mem_get_info()
+            batch_size = int(free_memory * headroom // per_image)
+        except Exception as e:
+            print(f"Batch size probe failed: {str(e)}")
+            batch_size = 1
+        
+        batch_size = max(1, min(max_batch_size, batch_size))
+        self.batch_sizes[key] = batch_size
+        print(f"Using batch size {batch_size} for {width}x{height}")
+        return batch_size
+    
+    def get_preview_decoder(self):
+        """Tiny SDXL VAE for previews, or the pipeline's own VAE if it cannot be loaded"""
+        if self.preview_decoder is None:
+            try:
+                from diffusers import AutoencoderTiny
+                self.preview_decoder = AutoencoderTiny.from_pretrained(
+                    PREVIEW_DECODER, torch_dtype=self.sd_pipeline.vae.dtype
+                ).to(self.sd_pipeline.device)
+            except Exception as e:
+                print(f"Tiny preview decoder unavailable, using the full VAE: {str(e)}")
+                self.preview_decoder = self.sd_pipeline.vae
+        return self.preview_decoder
+    
+    def decode_preview(self, latents):
+        """Decode latents to PIL images with the preview decoder"""
+        decoder = self.get_preview_decoder()
+        full_vae = decoder is self.sd_pipeline.vae
+        
+        # The full SDXL VAE overflows in fp16 and is upcast as the pipeline does when refining
+        upcast = full_vae and decoder.dtype == torch.float16 and decoder.config.force_upcast
+        try:
+            with torch.no_grad():
+                if upcast:
+                    self.sd_pipeline.upcast_vae()
+                dtype = next(iter(decoder.post_quant_conv.parameters())).dtype if full_vae else decoder.dtype
+                images = decoder.decode(latents.to(dtype) / decoder.config.scaling_factor).sample
+        finally:
+            if upcast:
+                decoder.to(dtype=torch.float16)
+        return self.sd_pipeline.image_processor.postprocess(images, output_type="pil")
+    
+    def generate_batch(self, prompts, width=1024, height=680, seeds=None, steps=None, preview=False):
+        """Generate one image per prompt in a single pipeline call
+        
+        Returns a list of (image, seed) in prompt order; seeds are random unless given.
+        Previews stop at the latents and are decoded with the tiny preview decoder.
+        """
+        if self.sd_pipeline is None:
+            if not self.initialize_stable_diffusion():
+                return [(None, None)] * len(prompts)
+        
+        if seeds is None:
+            seeds = [random.randint(1, 2147483647) for _ in prompts]
+        generators = [torch.Generator(device="cpu").manual_seed(seed)
+                      for seed in seeds]
+        
+        images = self.sd_pipeline(
+            **self.embedding_kwargs(list(prompts)),
+            width=width,
+            height=height,
+            num_inference_steps=steps or self.settings['steps'],
+            guidance_scale=self.settings['guidance'],
+            generator=generators,
+            output_type="latent" if preview else "pil"
+        ).images
+        if preview:
+            images = self.decode_preview(images)
+        return list(zip(images, seeds))
+    
+    def generate_previews(self, pending, width=1024, height=680, batch_size=1, on_preview=None):
+        """Render quick previews of pending (scene_index, prompt_data, seed) with the final seeds
+        
+        Previews use at most PREVIEW_STEPS steps and the tiny decoder, are saved under
+        output/images/previews and passed to on_preview(scene_index, path) as each
+        batch finishes.
+        """
+        preview_dir = os.path.join("output/images", "previews")
+        os.makedirs(preview_dir, exist_ok=True)
+        steps = min(PREVIEW_STEPS, self.settings['steps'])
+        previews = {}
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                generated = self.generate_batch(
+                    [prompt_data['prompt'] for _, prompt_data, _ in batch], width, height,
+                    [seed for _, _, seed in batch], steps=steps, preview=True
+                )
+            except Exception as e:
+                print(f"Preview generation failed: {str(e)}")
+                continue
+            for (idx, _, _), (image, _) in zip(batch, generated):
+                path = os.path.join(preview_dir, f"scene_{idx:03d}.jpg")
+                image.save(path, format="JPEG", quality=85)
+                previews[idx] = path
+                if on_preview is not None:
+                    on_preview(idx, path)
+        return previews
+    
+    def get_worker_pool(self, workers):
+        """Worker pool for the current mode, replacing one with different settings"""
+        pool = self.worker_pool
+        if pool is None or pool.workers != workers or pool.mode != self.mode or pool.save_options != self.image_writer.options:
+            if pool is not None:
+                pool.close()
+            self.worker_pool = ImageWorkerPool(workers, self.mode, self.image_writer.options)
+        return self.worker_pool
+    
+    def generate_with_workers(self, pending, manifest, workers, results, width=1024, height=680, on_image=None):
+        """Render pending (scene_index, prompt_data, seed) in the worker pool
+        
+        Completed scenes are added to results as {scene_index: path} as they arrive.
+        """
+        jobs = {}
+        for idx, prompt_data, seed in pending:
+            output_path = self.image_writer.path_for(os.path.join("output/images", f"scene_{idx:03d}"))
+            jobs[idx] = (idx, prompt_data['prompt'], seed, width, height, output_path)
+        
+        completed = 0
+        for idx, output_path, error in self.get_worker_pool(workers).generate(jobs.values()):
+            completed += 1
+            params = self.generation_params(jobs[idx][1], jobs[idx][2], width, height)
+            if output_path:
+                self.image_cache.put(params, output_path)
+                manifest.record(idx, generation_key(params), jobs[idx][2], output_path)
+                results[idx] = output_path
+                print(f"Generated image {idx} with seed {jobs[idx][2]} ({completed}/{len(jobs)})")
+                if on_image is not None:
+                    on_image(idx, output_path)
+            else:
+                manifest.record(idx, generation_key(params), jobs[idx][2], error=error)
+                print(f"Error generating image {idx}: {error}")
+    
+    def generate_story_images(self, image_prompts, batch_size=None, width=1024, height=680, project=None,
+                              render=None, duplicate_threshold=None, duplicate_mode='vary', duplicate_window=None,
+                              upscale_to=None):
+        """Generate one image per prompt, resuming from the manifest and image cache
+        
+        Returns one path per prompt in prompt order (a rejected scene's preview, or None
+        when a scene failed). render is a RenderOptions; near-duplicate scenes reuse or
+        reframe ('vary') an earlier image, and upscale_to returns render-size copies.
+        """
+        render = render or RenderOptions()
+        start = time.perf_counter()
+        manifest = GenerationManifest(os.path.join("output/images", "manifest.json"), project)
+        # The writer report covers this run only
+        self.image_writer.reset_stats()
+        
+        duplicates = {}
+        if duplicate_threshold:
+            # Shared style keywords would inflate the similarity of unrelated scenes
+            found = find_near_duplicates([prompt_data.get('base_prompt', prompt_data['prompt']) for prompt_data in image_prompts],
+                                         duplicate_threshold, duplicate_window)
+            duplicates = {index + 1: source + 1 for index, source in found.items()}
+        
+        results = {}
+        pending = []
         for idx, prompt_data in enumerate(image_prompts, 1):
-            output_path = os.path.join("output/images", f"scene_{idx:03d}.png")
+            seed = prompt_data.get('seed') or manifest.seed(idx)
+            params = self.generation_params(prompt_data['prompt'], seed, width, height)
+            key = generation_key(params)
+            output_path = self.image_writer.path_for(os.path.join("output/images", f"scene_{idx:03d}"))
+            if manifest.is_complete(idx, key, output_path):
+                results[idx] = output_path
+                print(f"Image {idx}/{len(image_prompts)} already generated")
+            elif idx in duplicates:
+                continue
+            elif self.image_cache.fetch(params, output_path):
+                manifest.record(idx, key, seed, output_path)
+                results[idx] = output_path
+                print(f"Image {idx}/{len(image_prompts)} loaded from cache")
+            else:
+                pending.append((idx, prompt_data, seed))
+                continue
+            if render.on_image is not None:
+                render.on_image(idx, output_path)
+        self.image_cache.flush()
+        
+        if pending and render.uses_workers:
+            try:
+                self.generate_with_workers(pending, manifest, render.workers, results, width, height, render.on_image)
+            except RuntimeError as e:
+                print(f"Worker pool failed, generating in this process: {str(e)}")
+            # Scenes the workers could not finish are retried here
+            pending = [job for job in pending if job[0] not in results]
+        
+        if pending and self.sd_pipeline is None:
+            if not self.initialize_stable_diffusion():
+                pending = []
+        
+        if pending and batch_size is None:
+            batch_size = self.probe_batch_size(width, height)
+        
+        previews = {}
+        if pending and render.progressive:
+            previews = self.generate_previews(pending, width, height, batch_size, render.on_preview)
+        
+        while pending:
+            # Scenes rejected from their preview are dropped, even while refinement runs
+            if render.progressive and render.should_refine is not None:
+                pending = [job for job in pending if render.should_refine(job[0])]
+                if not pending:
+                    break
+            batch = pending[:batch_size]
+            error = None
+            try:
+                generated = self.generate_batch(
+                    [prompt_data['prompt'] for _, prompt_data, _ in batch], width, height,
+                    [seed for _, _, seed in batch]
+                )
+            except torch.cuda.OutOfMemoryError as e:
+                torch.cuda.empty_cache()
+                if batch_size > 1:
+                    batch_size = max(1, batch_size // 2)
+                    self.batch_sizes[(width, height)] = batch_size
+                    print(f"Out of memory, reducing batch size to {batch_size}")
+                    continue
+                generated, error = [(None, None)] * len(batch), str(e)
+            except Exception as e:
+                print(f"Batch generation failed: {str(e)}")
+                generated, error = [(None, None)] * len(batch), str(e)
+            pending = pending[len(batch):]
+            
+            # Split the batch back into scene slots
+            for (idx, prompt_data, seed), (image, _) in zip(batch, generated):
+                params = self.generation_params(prompt_data['prompt'], seed, width, height)
+                output_path = self.image_writer.path_for(os.path.join("output/images", f"scene_{idx:03d}"))
+                if image is None:
+                    image, _ = self.generate_with_retries(prompt_data['prompt'], width, height, seed)
+                if image is not None:
+                    results[idx] = self.image_writer.submit(
+                        image, output_path, self._saved_callback(manifest, idx, params, seed, render.on_image)
+                    )
+                    print(f"Generated image {idx}/{len(image_prompts)} with seed {seed}")
+                else:
+                    manifest.record(idx, generation_key(params), seed, error=error or "generation failed")
+        
+        # Wait for the writer before reporting paths
+        self.image_writer.wait()
+        self.resolve_saved(results)
+        
+        # Near-duplicate scenes take their image from the source scene
+        reused = [idx for idx in duplicates if idx not in results]
+        for idx in reused:
+            prompt_data = image_prompts[idx - 1]
+            seed = prompt_data.get('seed') or manifest.seed(idx)
+            key = generation_key(self.generation_params(prompt_data['prompt'], seed, width, height))
+            output_path = self.image_writer.path_for(os.path.join("output/images", f"scene_{idx:03d}"))
+            source_path = results.get(duplicates[idx])
+            if source_path is None:
+                print(f"No image for scene {duplicates[idx]}, generating near-duplicate scene {idx}")
+                if self.sd_pipeline is None and not self.initialize_stable_diffusion():
+                    continue
+                image, _ = self.generate_with_retries(prompt_data['prompt'], width, height, seed)
+                if image is not None:
+                    params = self.generation_params(prompt_data['prompt'], seed, width, height)
+                    results[idx] = self.image_writer.submit(
+                        image, output_path, self._saved_callback(manifest, idx, params, seed, render.on_image)
+                    )
+                continue
+            
+            def on_saved(path, idx=idx, key=key, seed=seed):
+                manifest.record(idx, key, seed, path)
+                if render.on_image is not None:
+                    render.on_image(idx, path)
             
-            # Generate image with multiple attempts if needed
-            max_attempts = 3
-            for attempt in range(max_attempts):
-                try:
-                    # Extract the prompt
-                    base_prompt = prompt_data['prompt']
-                    
-                    # Generate the image
-                    image, seed = self.generate_image(base_prompt)
-                    
-                    if image:
-                        # Save in high quality
-                        image.save(output_path, format="PNG", quality=100)
-                        image_paths.append(output_path)
-                        print(f"Generated image {idx}/{len(image_prompts)} with seed {seed}")
-                        break
-                except Exception as e:
-                    if attempt == max_attempts - 1:
-                        print(f"Failed to generate image {idx} after {max_attempts} attempts: {str(e)}")
-                    else:
-                        print(f"Attempt {attempt + 1} failed, retrying...")
-                        time.sleep(2)
-        
-        return image_paths 
\ No newline at end of file
+            if duplicate_mode == 'reuse':
+                shutil.copyfile(source_path, output_path)
+                on_saved(output_path)
+                results[idx] = output_path
+            else:
+                with Image.open(source_path) as source:
+                    image = vary_image(source.convert("RGB"), idx)
+                results[idx] = self.image_writer.submit(image, output_path, on_saved)
+        if reused:
+            self.image_writer.wait()
+            self.resolve_saved(results)
+            print(f"Reused images for {len(reused)} near-duplicate scenes, "
+                  f"saving {len(reused)} of {len(image_prompts)} generations")
+        
+        print(self.image_writer.report())
+        image_paths = [results.get(idx, previews.get(idx)) for idx in range(1, len(image_prompts) + 1)]
+        self.last_timings = {'width': width, 'height': height, 'generation_seconds': time.perf_counter() - start}
+        
+        if upscale_to:
+            # Generated, cached, reused and preview images alike are replaced by render-size copies
+            image_paths, upscale_timings = upscale_files(image_paths, target=upscale_to)
+            self.last_timings.update(upscale_timings)
+            print(f"Generated {sum(path is not None for path in image_paths)} images at {width}x{height} in "
+                  f"{self.last_timings['generation_seconds']:.1f} s, upscaled to cover "
+                  f"{upscale_to[0]}x{upscale_to[1]} in {upscale_timings['resize_seconds']:.1f} s "
+                  f"(+{upscale_timings['write_seconds']:.1f} s writing)")
+        return image_paths
+    
+    def resolve_saved(self, results):
+        """Replace writer futures in results by their paths, dropping failed writes"""
+        for idx, result in list(results.items()):
+            if isinstance(result, str):
+                continue
+            if result.exception() is None:
+                results[idx] = result.result()
+            else:
+                print(f"Error saving image {idx}: {str(result.exception())}")
+                del results[idx]
+    
+    def _saved_callback(self, manifest, scene_index, params, seed, on_image=None):
+        """Callback that caches a written scene image and records it in the manifest"""
+        def on_saved(path):
+            self.image_cache.put(params, path)
+            manifest.record(scene_index, generation_key(params), seed, path)
+            if on_image is not None:
+                on_image(scene_index, path)
+        return on_saved
+    
+    def generate_with_retries(self, prompt, width=1024, height=680, seed=None, max_attempts=3):
+        """Generate a single image with multiple attempts if needed"""
+        for attempt in range(max_attempts):
+            try:
+                image, seed = self.generate_image(prompt, width, height, seed)
+                if image:
+                    return image, seed
+            except Exception as e:
+                if attempt == max_attempts - 1:
+                    print(f"Failed to generate image after {max_attempts} attempts: {str(e)}")
+                else:
+                    print(f"Attempt {attempt + 1} failed, retrying...")
+                    time.sleep(2)
+        return None, None
@@ -0,0 +1,210 @@
+import os
+import glob
+import time
+import queue
+import multiprocessing
+
+def _parse_cpu_list(text):
+    """Expand a kernel CPU list such as '0-3,8-11'"""
+    cpus = []
+    for part in text.strip().split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+def numa_cpu_sets():
+    """CPUs of each NUMA node available to this process (one set when unknown)"""
+    available = set(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else set(range(os.cpu_count() or 1))
+    nodes = []
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")):
+        try:
+            with open(path, 'r') as f:
+                cpus = [cpu for cpu in _parse_cpu_list(f.read()) if cpu in available]
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [sorted(available)]
+
+def plan_worker_cpus(workers, nodes=None):
+    """Assign each worker a disjoint slice of CPUs, spreading workers across NUMA nodes"""
+    nodes = nodes or numa_cpu_sets()
+    per_node = [[] for _ in nodes]
+    for worker in range(workers):
+        per_node[worker % len(nodes)].append(worker)
+
+    assignment = [None] * workers
+    for cpus, node_workers in zip(nodes, per_node):
+        for position, worker in enumerate(node_workers):
+            start = position * len(cpus) // len(node_workers)
+            end = (position + 1) * len(cpus) // len(node_workers)
+            assignment[worker] = cpus[start:end] or cpus
+    return assignment
+
+# Seconds one scene may take before its worker is considered stuck
+JOB_TIMEOUT_SECONDS = 1800
+
+# Seconds allowed for workers to start and load their pipelines
+STARTUP_SECONDS = 900
+
+# Seconds close() waits for a worker to exit before killing it
+CLOSE_TIMEOUT_SECONDS = 30
+
+# Thread pool variables read once when torch and the BLAS libraries load
+THREAD_VARIABLES = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+def _worker_main(worker_id, cpus, mode, save_options, jobs, results, current):
+    """Worker process: pin to its CPUs, load a pipeline and serve jobs until a None job
+
+    The thread pool variables are already set in the environment the process was
+    spawned with, since spawn re-imports the parent's main module (and with it torch)
+    before this function runs.
+    """
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+
+    import torch
+    from services.image_service import ImageService
+    torch.set_num_threads(max(1, len(cpus)))
+    service = ImageService(mode=mode)
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        scene_index, prompt, seed, width, height, output_path = job
+        # Shared memory is written at once, unlike the queue's feeder thread
+        current[worker_id] = scene_index
+        try:
+            image, _ = service.generate_with_retries(prompt, width, height, seed)
+            if image is None:
+                raise RuntimeError("generation failed")
+            image.save(output_path, **save_options)
+            results.put((worker_id, (scene_index, output_path, None)))
+        except Exception as e:
+            results.put((worker_id, (scene_index, None, str(e))))
+        # A worker dying after this point must not have its finished job requeued
+        current[worker_id] = -1
+
+class ImageWorkerPool:
+    """Processes that each hold a diffusion pipeline and pull scene jobs from a shared queue
+
+    Every worker is pinned to its own CPUs, spread across NUMA nodes, with its torch
+    and BLAS thread pools sized to match, so several scenes render at once without
+    the workers contending for cores. Workers start on first use and keep their
+    pipelines loaded until close(). The job each worker is running is tracked, so a
+    worker that dies has its job requeued once and then reported as failed.
+    """
+
+    def __init__(self, workers=None, mode=None, save_options=None, job_timeout=JOB_TIMEOUT_SECONDS):
+        """Configure the pool; workers defaults to one per NUMA node (at least two)"""
+        self.workers = workers or max(2, len(numa_cpu_sets()))
+        self.mode = mode
+        self.save_options = save_options or {'format': 'PNG'}
+        self.job_timeout = job_timeout
+        self.context = multiprocessing.get_context('spawn')
+        self.processes = []
+        self.jobs = None
+        self.results = None
+        self.current = None
+
+    def start(self):
+        """Start the worker processes with thread counts matching their CPUs"""
+        if self.processes:
+            return
+        self.jobs = self.context.Queue()
+        self.results = self.context.Queue()
+        self.current = self.context.Array('i', [-1] * self.workers, lock=False)
+        saved = {variable: os.environ.get(variable) for variable in THREAD_VARIABLES}
+        try:
+            for worker_id, cpus in enumerate(plan_worker_cpus(self.workers)):
+                # The child inherits the environment at spawn time
+                for variable in THREAD_VARIABLES:
+                    os.environ[variable] = str(max(1, len(cpus)))
+                process = self.context.Process(
+                    target=_worker_main,
+                    args=(worker_id, cpus, self.mode, self.save_options, self.jobs, self.results, self.current),
+                    daemon=True
+                )
+                process.start()
+                self.processes.append(process)
+        finally:
+            for variable, value in saved.items():
+                if value is None:
+                    os.environ.pop(variable, None)
+                else:
+                    os.environ[variable] = value
+
+    def terminate(self):
+        """Kill the workers without waiting for their jobs"""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join(5)
+        self.processes = []
+
+    def generate(self, jobs, deadline_seconds=None):
+        """Run (scene_index, prompt, seed, width, height, output_path) jobs
+
+        Yields (scene_index, output_path, error) as each scene completes; output_path is
+        None when the scene failed. Jobs of workers that die are requeued once while
+        other workers are alive. Past the deadline (by default the job timeout per
+        round of jobs plus startup time) the workers are stopped and every unfinished
+        scene is reported as failed.
+        """
+        self.start()
+        jobs = list(jobs)
+        if deadline_seconds is None:
+            rounds = -(-len(jobs) // self.workers)
+            deadline_seconds = STARTUP_SECONDS + self.job_timeout * rounds
+        deadline = time.monotonic() + deadline_seconds
+
+        outstanding = {job[0]: job for job in jobs}
+        requeued = set()
+        for job in jobs:
+            self.jobs.put(job)
+
+        while outstanding:
+            if time.monotonic() > deadline:
+                self.terminate()
+                for scene_index in list(outstanding):
+                    del outstanding[scene_index]
+                    yield scene_index, None, "image workers timed out"
+                return
+            try:
+                _, result = self.results.get(timeout=5)
+                if result[0] in outstanding:
+                    del outstanding[result[0]]
+                    yield result
+                continue
+            except queue.Empty:
+                pass
+
+            # Jobs held by dead workers are requeued once, or fail
+            alive = [process.is_alive() for process in self.processes]
+            for worker_id, is_alive in enumerate(alive):
+                job = outstanding.get(self.current[worker_id])
+                if is_alive or job is None:
+                    continue
+                self.current[worker_id] = -1
+                if any(alive) and job[0] not in requeued:
+                    requeued.add(job[0])
+                    self.jobs.put(job)
+                else:
+                    del outstanding[job[0]]
+                    yield job[0], None, "image worker exited"
+            if not any(alive):
+                self.processes = []
+                raise RuntimeError("All image workers exited")
+
+    def close(self, timeout=CLOSE_TIMEOUT_SECONDS):
+        """Stop the workers and release their pipelines, killing workers still busy after timeout"""
+        for _ in self.processes:
+            self.jobs.put(None)
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+        self.terminate()
@@ -0,0 +1,88 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# Intermediate image formats: file extension and Pillow save options
+IMAGE_FORMATS = {
+    'png': {'extension': 'png', 'format': 'PNG'},
+    'webp': {'extension': 'webp', 'format': 'WEBP', 'lossless': True},
+    'jpeg': {'extension': 'jpg', 'format': 'JPEG', 'subsampling': 0}
+}
+
+class ImageWriter:
+    """Saves generated images on background threads
+
+    At most max_pending images wait to be written; submitting beyond that blocks, so
+    memory stays bounded when encoding falls behind generation. PNG uses
+    compress_level, JPEG uses quality and lossless WebP uses method as its effort.
+    Bytes written and time spent encoding are accumulated for reporting until
+    reset_stats().
+    """
+
+    def __init__(self, image_format='png', compress_level=6, quality=95, method=4, max_workers=2, max_pending=4):
+        """Configure the format and the writer pool"""
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {image_format}")
+        self.image_format = image_format
+        self.options = {key: value for key, value in IMAGE_FORMATS[image_format].items() if key != 'extension'}
+        if image_format == 'png':
+            self.options['compress_level'] = compress_level
+        elif image_format == 'jpeg':
+            self.options['quality'] = quality
+        else:
+            self.options['method'] = method
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.slots = threading.Semaphore(max_pending)
+        self.futures = []
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def extension(self):
+        """File extension of the configured format"""
+        return IMAGE_FORMATS[self.image_format]['extension']
+
+    def path_for(self, base_path):
+        """base_path with the configured format's extension"""
+        return f"{base_path}.{self.extension}"
+
+    def _write(self, image, path, on_saved):
+        """Encode one image, then run its completion callback"""
+        try:
+            start = time.perf_counter()
+            image.save(path, **self.options)
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.images_written += 1
+                self.bytes_written += os.path.getsize(path)
+                self.seconds_spent += elapsed
+            if on_saved is not None:
+                on_saved(path)
+            return path
+        finally:
+            self.slots.release()
+
+    def submit(self, image, path, on_saved=None):
+        """Queue image to be written to path; on_saved(path) runs after the write"""
+        self.slots.acquire()
+        future = self.executor.submit(self._write, image, path, on_saved)
+        self.futures.append(future)
+        return future
+
+    def wait(self):
+        """Wait for every queued write to finish"""
+        futures, self.futures = self.futures, []
+        wait(futures)
+
+    def reset_stats(self):
+        """Start counting images, bytes and encoding time from zero"""
+        with self.lock:
+            self.images_written = 0
+            self.bytes_written = 0
+            self.seconds_spent = 0.0
+
+    def report(self):
+        """Summary of bytes written and time spent"""
+        return (f"Wrote {self.images_written} {self.image_format.upper()} images, "
+                f"{self.bytes_written / (1 << 20):.1f} MB in {self.seconds_spent:.2f} s of encoding")
@@ -0,0 +1,163 @@
+import os
+import numpy as np
+from services.audio_io import BLOCK_FRAMES, BlockWriter, audio_info, block_rms_envelope, iter_blocks
+from services.loudness import HOP_SECONDS, k_weighted_powers, loudness_from_powers
+
+def db_to_amplitude(db):
+    """Convert decibels to amplitude ratio"""
+    return 10 ** (np.asarray(db) / 20)
+
+def frame_view(samples, frame_length):
+    """View whole frames of samples as a (frames, frame_length) array"""
+    num_frames = len(samples) // frame_length
+    return samples[:num_frames * frame_length].reshape(num_frames, frame_length)
+
+def moving_max(values, before, after):
+    """Maximum of values over [i - before, i + after] for every index"""
+    padded = np.pad(values, (before, after), mode='edge')
+    windows = np.lib.stride_tricks.sliding_window_view(padded, before + after + 1)
+    return windows.max(axis=1)
+
+def moving_average(values, width):
+    """Centered box average of width samples (edge padded)"""
+    if width <= 1:
+        return values
+    padded = np.pad(values, (width // 2, width - 1 - width // 2), mode='edge')
+    cumulative = np.concatenate(([0.0], np.cumsum(padded)))
+    return (cumulative[width:] - cumulative[:-width]) / width
+
+def apply_frame_gain(samples, frame_gain, frame_length, offset=0):
+    """Multiply a block starting at sample offset in place by a per-frame gain curve
+
+    The curve is interpolated linearly between frame centres.
+    """
+    centres = (np.arange(len(frame_gain)) + 0.5) * frame_length
+    positions = np.arange(offset, offset + len(samples), dtype=np.float64)
+    samples *= np.interp(positions, centres, frame_gain).astype(np.float32)
+    return samples
+
+def true_peak_envelope(samples, frame_length, oversample=4, frames_per_batch=2048):
+    """Per-frame true peak estimated with FFT oversampling"""
+    remainder = len(samples) % frame_length
+    if remainder:
+        samples = np.concatenate((samples, np.zeros(frame_length - remainder, dtype=np.float32)))
+    frames = frame_view(samples, frame_length)
+
+    peaks = np.empty(len(frames))
+    for first in range(0, len(frames), frames_per_batch):
+        batch = frames[first:first + frames_per_batch]
+        spectrum = np.fft.rfft(batch, axis=1)
+        upsampled = np.fft.irfft(spectrum, n=frame_length * oversample, axis=1) * oversample
+        peaks[first:first + frames_per_batch] = np.maximum(np.abs(upsampled).max(axis=1), np.abs(batch).max(axis=1))
+    return peaks
+
+class AudioMaster:
+    """Mixes narration with ambient and music beds into one loudness-normalized master
+
+    Beds are ducked under speech using the narration's RMS envelope, the sum is
+    normalized to a target integrated loudness (measured with the approximate
+    K-weighting of services.loudness), and a look-ahead true-peak limiter
+    keeps oversampled peaks under the ceiling. Audio is streamed in fixed-size blocks:
+    one pass measures the narration envelope, one measures loudness and peaks of the
+    mix, and one renders it, so memory use does not grow with story length.
+    """
+
+    def __init__(self, target_lufs=-14.0, true_peak_db=-1.0, duck_depth_db=-10.0, speech_threshold_db=-40.0,
+                 frame_seconds=0.02, attack_seconds=0.08, release_seconds=0.6, block_frames=BLOCK_FRAMES):
+        """Configure loudness target, limiter ceiling and ducking behaviour"""
+        self.target_lufs = target_lufs
+        self.true_peak_db = true_peak_db
+        self.duck_depth_db = duck_depth_db
+        self.speech_threshold_db = speech_threshold_db
+        self.frame_seconds = frame_seconds
+        self.attack_seconds = attack_seconds
+        self.release_seconds = release_seconds
+        self.block_frames = block_frames
+
+    def ducking_gain(self, narration_envelope):
+        """Per-frame bed gain: duck_depth_db while speech is present, 0 dB otherwise
+
+        The speech mask is held for the release time and anticipated by the attack time,
+        then smoothed so the beds glide down before a phrase and recover after it.
+        """
+        level_db = 20 * np.log10(np.maximum(narration_envelope, 1e-9))
+        speech = (level_db > self.speech_threshold_db).astype(np.float64)
+
+        attack_frames = max(int(self.attack_seconds / self.frame_seconds), 1)
+        release_frames = max(int(self.release_seconds / self.frame_seconds), 1)
+        held = moving_max(speech, release_frames, attack_frames)
+        smoothed = moving_average(held, attack_frames)
+        return db_to_amplitude(smoothed * self.duck_depth_db)
+
+    def limiter_gain(self, peaks):
+        """Per-frame gain keeping the given true peaks at or below the ceiling"""
+        ceiling = float(db_to_amplitude(self.true_peak_db))
+        required = np.minimum(1.0, ceiling / np.maximum(peaks, 1e-9))
+
+        # Reduction starts early enough that the smoothed curve reaches it at the peak
+        ramp_frames = max(int(self.attack_seconds / self.frame_seconds), 1)
+        required = -moving_max(-required, ramp_frames, ramp_frames)
+        return moving_average(required, ramp_frames), ceiling
+
+    def mixed_blocks(self, narration_path, beds, sample_rate, length, block_frames, duck, frame_length):
+        """Yield (offset, block) of narration plus ducked beds"""
+        bed_streams = [(iter_blocks(path, block_frames, sample_rate, length, loop=True), float(db_to_amplitude(level_db)))
+                       for path, level_db in beds]
+        offset = 0
+        for block in iter_blocks(narration_path, block_frames):
+            mix = np.array(block, dtype=np.float32)
+            if bed_streams:
+                bed_mix = np.zeros(len(mix), dtype=np.float32)
+                for stream, gain in bed_streams:
+                    bed_block = next(stream)
+                    bed_mix[:len(bed_block)] += bed_block * gain
+                mix += apply_frame_gain(bed_mix, duck, frame_length, offset)
+            yield offset, mix
+            offset += len(mix)
+
+    def master(self, narration_path, output_path, ambient_path=None, music_path=None, ambient_db=-15.0, music_db=-10.0):
+        """Render the mastered mix of narration, ambient and music to output_path"""
+        length, sample_rate, _ = audio_info(narration_path)
+        frame_length = max(int(self.frame_seconds * sample_rate), 1)
+
+        # Blocks hold whole envelope frames and whole loudness sub-blocks
+        alignment = int(np.lcm(frame_length, int(round(HOP_SECONDS * sample_rate))))
+        block_frames = max(self.block_frames // alignment, 1) * alignment
+
+        beds = []
+        for path, level_db in ((ambient_path, ambient_db), (music_path, music_db)):
+            if path and os.path.exists(path):
+                try:
+                    audio_info(path)
+                    beds.append((path, level_db))
+                except Exception as e:
+                    print(f"Warning: Could not load bed {path}: {str(e)}")
+
+        # Pass 1: sidechain curve from the narration envelope drives every bed
+        duck = None
+        if beds:
+            duck = self.ducking_gain(block_rms_envelope(narration_path, frame_length, block_frames))
+
+        # Pass 2: loudness and true peaks of the unnormalized mix
+        powers, peaks = [], []
+        for _, mix in self.mixed_blocks(narration_path, beds, sample_rate, length, block_frames, duck, frame_length):
+            powers.append(k_weighted_powers(mix, sample_rate))
+            peaks.append(true_peak_envelope(mix, frame_length))
+        powers = np.concatenate(powers) if powers else np.zeros(0)
+        measured = loudness_from_powers(powers) if len(powers) else self.target_lufs
+        normalization = float(db_to_amplitude(self.target_lufs - measured))
+        limiter, ceiling = self.limiter_gain(np.concatenate(peaks) * normalization if peaks else np.zeros(0))
+
+        # Pass 3: normalize, limit (with a final sample clip as a safety net) and write
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with BlockWriter(output_path, sample_rate) as writer:
+            for offset, mix in self.mixed_blocks(narration_path, beds, sample_rate, length, block_frames, duck, frame_length):
+                mix *= normalization
+                apply_frame_gain(mix, limiter, frame_length, offset)
+                np.clip(mix, -ceiling, ceiling, out=mix)
+                writer.write(mix)
+
+        max_limiting = 20 * np.log10(max(float(limiter.min()), 1e-9)) if len(limiter) else 0.0
+        print(f"Mastered audio: {measured:.1f} LUFS (approx.) -> {self.target_lufs:.1f} LUFS, "
+              f"max limiting {max_limiting:.1f} dB: {output_path}")
+        return output_path
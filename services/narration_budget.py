@@ -0,0 +1,170 @@
+import re
+import math
+
+# Kokoro narration rate at speed 1.0 (words per minute, pauses included)
+WORDS_PER_MINUTE = 160.0
+
+# Rough cost model per downstream stage, in seconds of work
+STAGE_COSTS = {
+    'tts_rtf': 0.15,  # TTS seconds per second of narration
+    'asr_rtf': 0.10,  # Speech recognition seconds per second of narration
+    'llm_seconds_per_call': 5.0,  # Gemini call plus rate-limit delay
+    'image_seconds': 12.0,  # One SDXL image at 40 steps
+    'render_rtf': 0.6  # Video render seconds per second of narration
+}
+
+WORD_PATTERN = re.compile(r"[\w']+")
+SENTENCE_PATTERN = re.compile(r'[^.!?]+[.!?]+["\'”’)]*\s*|[^.!?]+$')
+
+def count_words(text):
+    """Count spoken words in text"""
+    return len(WORD_PATTERN.findall(text))
+
+def cut_words(text, max_words):
+    """Leading part of text holding at most max_words words, cut after a word"""
+    if max_words < 1:
+        return ""
+    for index, match in enumerate(WORD_PATTERN.finditer(text), 1):
+        if index == max_words:
+            return text[:match.end()].rstrip()
+    return text.rstrip()
+
+def estimate_narration_seconds(text, speed=0.85, words_per_minute=WORDS_PER_MINUTE):
+    """Predict narration length of text at a voice speed"""
+    return count_words(text) / (words_per_minute * speed) * 60
+
+class NarrationBudget:
+    """Predicts narration length and pipeline cost before any synthesis
+
+    The budget is a window of narration seconds. Word counts are converted with the
+    narrator's speaking rate scaled by voice speed; downstream costs follow from the
+    predicted duration and the scene planner's shot length or image budget.
+    """
+
+    def __init__(self, min_seconds=0.0, max_seconds=600.0, speed=0.85, words_per_minute=WORDS_PER_MINUTE,
+                 planner=None, max_images=None, stage_costs=None):
+        """Configure the duration window, voice speed and cost model"""
+        if max_seconds <= min_seconds:
+            raise ValueError("max_seconds must be greater than min_seconds")
+        self.min_seconds = min_seconds
+        self.max_seconds = max_seconds
+        self.speed = speed
+        self.words_per_minute = words_per_minute
+        self.planner = planner
+        self.max_images = max_images
+        self.stage_costs = dict(STAGE_COSTS, **(stage_costs or {}))
+
+    @property
+    def effective_words_per_minute(self):
+        """Speaking rate at the configured voice speed"""
+        return self.words_per_minute * self.speed
+
+    def word_window(self):
+        """Return the (min, max) word counts that fit the duration window"""
+        rate = self.effective_words_per_minute / 60
+        return int(math.ceil(self.min_seconds * rate)), int(self.max_seconds * rate)
+
+    def estimate(self, text):
+        """Predict narration seconds for text"""
+        return estimate_narration_seconds(text, self.speed, self.words_per_minute)
+
+    def calibrate(self, text, narration_seconds):
+        """Update the speaking rate from a narration that was actually synthesized"""
+        if narration_seconds > 0 and count_words(text):
+            self.words_per_minute = count_words(text) / (narration_seconds / 60) / self.speed
+        return self.words_per_minute
+
+    def predict_costs(self, narration_seconds):
+        """Predict work for every downstream stage of a narration of this length"""
+        costs = self.stage_costs
+        if self.planner is not None:
+            target = self.planner.target_shot_seconds
+            budget = self.planner.image_budget(narration_seconds * 1000)
+        else:
+            target, budget = 8.0, None
+        images = max(1, int(math.ceil(narration_seconds / target))) if narration_seconds > 0 else 0
+        if budget:
+            images = min(images, budget)
+
+        # One scene description and one image prompt call per image, plus enhancement
+        llm_calls = 2 * images + 1
+        stages = {
+            'tts_seconds': narration_seconds * costs['tts_rtf'],
+            'asr_seconds': narration_seconds * costs['asr_rtf'],
+            'llm_seconds': llm_calls * costs['llm_seconds_per_call'],
+            'image_seconds': images * costs['image_seconds'],
+            'render_seconds': narration_seconds * costs['render_rtf']
+        }
+        return {
+            'narration_seconds': narration_seconds,
+            'scenes': images,
+            'images': images,
+            'llm_calls': llm_calls,
+            **stages,
+            'total_seconds': sum(stages.values())
+        }
+
+    def check(self, text):
+        """Report predicted duration, cost and whether the script fits the budget
+
+        status is 'ok', 'too_short' or 'too_long'; 'too_many_images' is set when a
+        max_images limit would be exceeded.
+        """
+        narration_seconds = self.estimate(text)
+        costs = self.predict_costs(narration_seconds)
+        if narration_seconds > self.max_seconds:
+            status = 'too_long'
+        elif narration_seconds < self.min_seconds:
+            status = 'too_short'
+        else:
+            status = 'ok'
+        return {
+            'status': status,
+            'words': count_words(text),
+            'word_window': self.word_window(),
+            'too_many_images': bool(self.max_images and costs['images'] > self.max_images),
+            **costs
+        }
+
+    def trim_to_fit(self, text):
+        """Cut a script to the maximum duration at a sentence boundary, keeping its closing paragraph
+
+        When whole sentences fall short of the minimum duration (no sentence fits, or
+        the text has no sentence terminators), the script is cut at the word boundary
+        that fills the maximum instead. Raises ValueError when no words would remain.
+        """
+        min_words, max_words = self.word_window()
+        if count_words(text) <= max_words:
+            return text
+        if max_words < 1:
+            raise ValueError("Narration budget leaves no room for any words")
+
+        paragraphs = [p for p in text.strip().split('\n') if p.strip()]
+        closing = paragraphs[-1] if len(paragraphs) > 1 else ""
+        if count_words(closing) >= max_words:
+            # A closing paragraph that fills the budget would leave no story
+            closing = ""
+        body = '\n'.join(paragraphs[:-1]) if closing else text.strip()
+        remaining = max_words - count_words(closing)
+
+        kept = []
+        for sentence in SENTENCE_PATTERN.findall(body):
+            if count_words(sentence) > remaining:
+                break
+            remaining -= count_words(sentence)
+            kept.append(sentence)
+        trimmed = ''.join(kept).rstrip()
+
+        if count_words(trimmed) + count_words(closing) < max(min_words, 1) or not count_words(trimmed):
+            trimmed = cut_words(body, max_words - count_words(closing))
+        if not count_words(trimmed):
+            raise ValueError("Script has no words left after trimming to the narration budget")
+        return f"{trimmed}\n\n{closing}" if closing else trimmed
+
+    def format_report(self, report):
+        """Human-readable summary of a check() report"""
+        return (
+            f"{report['words']} words, ~{report['narration_seconds'] / 60:.1f} min narration "
+            f"({report['status'].replace('_', ' ')}); {report['images']} images, "
+            f"{report['llm_calls']} LLM calls, ~{report['total_seconds'] / 60:.0f} min predicted processing"
+        )
@@ -0,0 +1,157 @@
+import os
+import json
+import shutil
+import datetime
+from services import subtitles
+from services.timeline import Timeline
+from services.audio_io import audio_duration
+from services.file_utils import safe_slug
+from services.mastering import AudioMaster
+from services.encoding_service import ENCODING_PROFILES, EncodingService
+
+# Show information written into every episode
+PODCAST_SHOW = "The Withering Club"
+PODCAST_HOST = "Anna"
+
+def escape_ffmetadata(value):
+    """Escape a value for an FFMETADATA file"""
+    value = str(value)
+    for character in ('\\', '=', ';', '#', '\n'):
+        value = value.replace(character, '\\' + character)
+    return value
+
+class PodcastService:
+    """Service for audio-only podcast episodes"""
+
+    def __init__(self, output_dir="output/podcast", encoding_service=None):
+        """Initialize podcast service"""
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.encoding_service = encoding_service if encoding_service is not None else EncodingService()
+
+    def build_chapters(self, scenes, total_duration, min_chapter_seconds=90.0):
+        """Group scene boundaries into chapters of at least min_chapter_seconds
+
+        Returns a list of {'start_ms', 'end_ms', 'title'} covering the whole episode.
+        A chapter title is the opening of its first scene description.
+        """
+        total_ms = subtitles.seconds_to_ms(total_duration)
+        if scenes is None:
+            scenes = []
+        track = scenes.scenes if isinstance(scenes, Timeline) else Timeline().with_scenes(scenes).scenes
+
+        chapters = []
+        for start_ms, _, scene in track:
+            if start_ms >= total_ms:
+                break
+            if chapters and start_ms - chapters[-1]['start_ms'] < min_chapter_seconds * 1000:
+                continue
+            if not chapters:
+                start_ms = 0  # The first chapter always opens the episode
+            description = ' '.join(scene.get('description', '').split())
+            title = description.split('.')[0][:60].strip() or f"Part {len(chapters) + 1}"
+            chapters.append({'start_ms': start_ms, 'end_ms': total_ms, 'title': title})
+
+        if not chapters:
+            chapters.append({'start_ms': 0, 'end_ms': total_ms, 'title': "Full Episode"})
+
+        # A very short closing chapter is folded into the one before it
+        if len(chapters) > 1 and total_ms - chapters[-1]['start_ms'] < min_chapter_seconds * 1000 / 3:
+            chapters.pop()
+
+        # Each chapter ends where the next begins
+        for chapter, following in zip(chapters, chapters[1:]):
+            chapter['end_ms'] = following['start_ms']
+        return chapters
+
+    def write_ffmetadata(self, path, title, chapters, description=""):
+        """Write an FFMETADATA file carrying tags and chapter markers"""
+        lines = [
+            ";FFMETADATA1",
+            f"title={escape_ffmetadata(title)}",
+            f"artist={escape_ffmetadata(PODCAST_HOST)}",
+            f"album={escape_ffmetadata(PODCAST_SHOW)}",
+            "genre=Podcast",
+            f"comment={escape_ffmetadata(description)}"
+        ]
+        for chapter in chapters:
+            lines.extend([
+                "",
+                "[CHAPTER]",
+                "TIMEBASE=1/1000",
+                f"START={chapter['start_ms']}",
+                f"END={chapter['end_ms']}",
+                f"title={escape_ffmetadata(chapter['title'])}"
+            ])
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def write_episode_metadata(self, path, title, duration, chapters, files, description="", source_title=None):
+        """Write episode metadata JSON for publishing"""
+        metadata = {
+            'show': PODCAST_SHOW,
+            'host': PODCAST_HOST,
+            'title': title,
+            'source_title': source_title,
+            'description': description,
+            'duration_seconds': round(duration, 3),
+            'duration': subtitles.ms_to_timestamp(subtitles.seconds_to_ms(duration)).split(',')[0],
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'chapters': [
+                {
+                    'start': subtitles.ms_to_timestamp(chapter['start_ms'], separator='.'),
+                    'start_seconds': chapter['start_ms'] / 1000,
+                    'title': chapter['title']
+                }
+                for chapter in chapters
+            ],
+            'files': {
+                output_format: {'path': file_path, 'bytes': os.path.getsize(file_path)}
+                for output_format, file_path in files.items()
+            }
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        return path
+
+    def create_episode(self, narration_path, title, scenes=None, ambient_path=None, music_path=None,
+                       formats=('mp3', 'opus'), description="", source_title=None, target_lufs=-16.0):
+        """Master narration with its beds and encode a podcast episode
+
+        Returns a dict with the master, encoded files, chapters and metadata path.
+        """
+        slug = safe_slug(title)
+        episode_dir = os.path.join(self.output_dir, slug)
+        os.makedirs(episode_dir, exist_ok=True)
+
+        # Podcast loudness is mastered a little lower than video
+        master_path = AudioMaster(target_lufs=target_lufs).master(
+            narration_path,
+            os.path.join(episode_dir, f"{slug}_master.wav"),
+            ambient_path=ambient_path,
+            music_path=music_path
+        )
+
+        duration = audio_duration(master_path)
+        chapters = self.build_chapters(scenes, duration)
+        metadata_path = self.write_ffmetadata(os.path.join(episode_dir, "chapters.ffmeta"), title, chapters, description)
+
+        # All formats are encoded in parallel through the shared encode cache
+        files = {}
+        for output_format, cache_path in self.encoding_service.encode_all(master_path, formats, metadata_path).items():
+            output_path = os.path.join(episode_dir, f"{slug}.{ENCODING_PROFILES[output_format]['extension']}")
+            shutil.copy2(cache_path, output_path)
+            files[output_format] = output_path
+            print(f"Encoded {output_format}: {output_path}")
+
+        episode_path = self.write_episode_metadata(
+            os.path.join(episode_dir, "episode.json"), title, duration, chapters, files, description, source_title
+        )
+
+        return {
+            'master_path': master_path,
+            'files': files,
+            'chapters': chapters,
+            'metadata_path': episode_path
+        }
@@ -0,0 +1,61 @@
+import re
+import zlib
+import numpy as np
+from PIL import Image
+
+# Hashed character n-gram features
+NGRAM_SIZE = 3
+FEATURE_DIMENSIONS = 1 << 14
+
+# Similarity above which two scene prompts share an image
+DEFAULT_DUPLICATE_THRESHOLD = 0.9
+
+def normalize_prompt(text):
+    """Lowercase text with punctuation and repeated whitespace removed"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+def ngram_matrix(texts, n=NGRAM_SIZE, dimensions=FEATURE_DIMENSIONS):
+    """Unit-length hashed character n-gram count vectors, one row per text"""
+    matrix = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        padded = f" {normalize_prompt(text)} "
+        for start in range(max(len(padded) - n + 1, 1)):
+            matrix[row, zlib.crc32(padded[start:start + n].encode('utf-8')) % dimensions] += 1
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+def similarity_matrix(texts):
+    """Cosine similarity of every pair of texts"""
+    vectors = ngram_matrix(texts)
+    return vectors @ vectors.T
+
+def find_near_duplicates(texts, threshold=DEFAULT_DUPLICATE_THRESHOLD, window=None):
+    """Map each near-duplicate text index to the earlier index whose image it can reuse
+
+    Only texts that are not themselves duplicates serve as sources, so every chain
+    resolves to a generated image. With window set, only that many preceding texts
+    are compared.
+    """
+    similarity = similarity_matrix(texts)
+    duplicates = {}
+    for index in range(1, len(texts)):
+        first = 0 if window is None else max(0, index - window)
+        candidates = [source for source in range(first, index) if source not in duplicates]
+        if not candidates:
+            continue
+        best = max(candidates, key=lambda source: similarity[index, source])
+        if similarity[index, best] >= threshold:
+            duplicates[index] = best
+    return duplicates
+
+def vary_image(image, variant, zoom=0.08):
+    """Cheap variation of an image: a slight zoom toward a corner chosen by variant
+
+    The output keeps the input size, so a reused scene reads as a new camera framing
+    rather than a repeated frame.
+    """
+    width, height = image.size
+    crop_width, crop_height = int(width * (1 - zoom)), int(height * (1 - zoom))
+    corners = [(0, 0), (width - crop_width, 0), (0, height - crop_height), (width - crop_width, height - crop_height)]
+    left, top = corners[variant % len(corners)]
+    return image.crop((left, top, left + crop_width, top + crop_height)).resize((width, height), Image.LANCZOS)
@@ -0,0 +1,109 @@
+import re
+import math
+from services import subtitles
+
+# Cue text ending a sentence (optionally followed by closing quotes or brackets)
+SENTENCE_END = re.compile(r'[.!?…]["\'”’)\]]*\s*$')
+
+class ScenePlanner:
+    """Groups subtitle cues into shots of a target length
+
+    Shot boundaries are chosen at cue boundaries by dynamic programming: each shot costs
+    its squared relative deviation from the target length, plus a penalty when it does
+    not end at a sentence boundary, and shots outside the min/max bounds are only used
+    when a single cue forces it. Shots are contiguous and cover the whole timeline.
+    An optional images-per-minute budget caps the number of shots.
+    """
+
+    def __init__(self, target_shot_seconds=8.0, min_shot_seconds=4.0, max_shot_seconds=14.0,
+                 images_per_minute=None, sentence_penalty=0.5):
+        """Configure shot lengths and the optional image budget"""
+        if not 0 < min_shot_seconds <= target_shot_seconds <= max_shot_seconds:
+            raise ValueError("Shot lengths must satisfy 0 < min <= target <= max")
+        self.target_shot_seconds = target_shot_seconds
+        self.min_shot_seconds = min_shot_seconds
+        self.max_shot_seconds = max_shot_seconds
+        self.images_per_minute = images_per_minute
+        self.sentence_penalty = sentence_penalty
+
+    def image_budget(self, duration_ms):
+        """Maximum number of shots for a story of duration_ms, or None without a budget"""
+        if not self.images_per_minute:
+            return None
+        return max(1, math.ceil(duration_ms / 60000 * self.images_per_minute))
+
+    def _boundaries(self, cues, start_ms, end_ms, target_ms, min_ms, max_ms):
+        """Return the cue indices that start each shot, from the dynamic program"""
+        count = len(cues)
+        # Shot i..j spans from the start of cue i (or the timeline start) to the start of cue j+1
+        edges = [start_ms] + [cue.start_ms for cue in cues[1:]] + [end_ms]
+        sentence_end = [bool(SENTENCE_END.search(cue.text)) for cue in cues]
+
+        best = [0.0] + [math.inf] * count
+        previous = [0] * (count + 1)
+        for j in range(1, count + 1):
+            for i in range(j - 1, -1, -1):
+                length = edges[j] - edges[i]
+                single = i == j - 1
+                if length > max_ms and not single:
+                    break
+                if length < min_ms and i > 0 and j < count:
+                    continue
+                cost = ((length - target_ms) / target_ms) ** 2
+                if j < count and not sentence_end[j - 1]:
+                    cost += self.sentence_penalty
+                if best[i] + cost < best[j]:
+                    best[j] = best[i] + cost
+                    previous[j] = i
+
+        starts = []
+        j = count
+        while j > 0:
+            j = previous[j]
+            starts.append(j)
+        return starts[::-1]
+
+    def plan_cues(self, cues, duration_ms=None):
+        """Plan shots over subtitles.Cue objects
+
+        Returns a list of subtitles.Cue whose text joins the narration of the shot.
+        """
+        cues = sorted(cues, key=lambda cue: cue.start_ms)
+        if not cues:
+            return []
+        start_ms = 0
+        end_ms = max(duration_ms or 0, cues[-1].end_ms)
+
+        target_ms = self.target_shot_seconds * 1000
+        min_ms = self.min_shot_seconds * 1000
+        max_ms = self.max_shot_seconds * 1000
+
+        # Lengthen shots until the plan fits the image budget
+        budget = self.image_budget(end_ms - start_ms)
+        if budget:
+            target_ms = max(target_ms, (end_ms - start_ms) / budget)
+        while True:
+            starts = self._boundaries(cues, start_ms, end_ms, target_ms, min_ms, max(max_ms, target_ms * 1.5))
+            if not budget or len(starts) <= budget or len(starts) == 1:
+                break
+            target_ms *= 1.1
+
+        shots = []
+        for index, first in enumerate(starts):
+            last = starts[index + 1] if index + 1 < len(starts) else len(cues)
+            shot_start = start_ms if index == 0 else cues[first].start_ms
+            shot_end = cues[last].start_ms if last < len(cues) else end_ms
+            text = ' '.join(cue.text for cue in cues[first:last])
+            shots.append(subtitles.Cue(shot_start, shot_end, text))
+        return shots
+
+    def plan_segments(self, segments, duration_ms=None):
+        """Plan shots over subtitle segment dicts ('start_time', 'end_time', 'text')
+
+        Returns segment dicts in the same format, one per shot.
+        """
+        cues = [
+            subtitles.Cue(subtitles.timestamp_to_ms(seg['start_time']), subtitles.timestamp_to_ms(seg['end_time']), seg['text'])
+            for seg in segments
+        ]
+        return subtitles.cues_to_segments(self.plan_cues(cues, duration_ms))
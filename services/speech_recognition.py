@@ -0,0 +1,254 @@
+import os
+import numpy as np
+
+# Sample rate expected by every Whisper-family model
+ASR_SAMPLE_RATE = 16000
+
+class ASRBackend:
+    """Base class for speech recognition backends used by AudioService"""
+
+    name = "base"
+
+    def __init__(self, model_size="base"):
+        """Store settings, the model itself is loaded lazily"""
+        self.model_size = model_size
+        self.model = None
+
+    def load(self):
+        """Load the underlying model"""
+        raise NotImplementedError
+
+    def load_audio(self, audio_path):
+        """Decode an audio file to mono float32 at 16 kHz"""
+        import whisper
+        return whisper.load_audio(audio_path)
+
+    def transcribe(self, audio):
+        """Transcribe audio and return a list of {'start', 'end', 'text'} segments"""
+        raise NotImplementedError
+
+class WhisperBackend(ASRBackend):
+    """Reference backend built on openai-whisper"""
+
+    name = "whisper"
+
+    def load(self):
+        """Load the openai-whisper model"""
+        if self.model is None:
+            import whisper
+            self.model = whisper.load_model(self.model_size)
+        return self.model
+
+    def transcribe(self, audio):
+        """Transcribe with openai-whisper"""
+        import torch
+
+        result = self.load().transcribe(
+            audio,
+            verbose=False,
+            word_timestamps=True,
+            fp16=torch.cuda.is_available()
+        )
+
+        return [
+            {'start': segment['start'], 'end': segment['end'], 'text': segment['text']}
+            for segment in result["segments"]
+        ]
+
+class FasterWhisperBackend(ASRBackend):
+    """Quantized CTranslate2 backend (faster-whisper) for CPU-only hosts"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size="base", compute_type="int8", cpu_threads=0, batch_size=16):
+        """Store settings, int8 weights keep CPU inference fast and small"""
+        super().__init__(model_size)
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.batch_size = batch_size
+        self.batched_model = None
+
+    def load(self):
+        """Load the CTranslate2 model and, if available, the batched VAD pipeline"""
+        if self.model is None:
+            from faster_whisper import WhisperModel
+
+            self.model = WhisperModel(
+                self.model_size,
+                device="cpu",
+                compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads
+            )
+
+            # Batched inference groups VAD speech regions into a single decoder batch
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self.batched_model = BatchedInferencePipeline(model=self.model)
+            except ImportError:
+                self.batched_model = None
+        return self.model
+
+    def load_audio(self, audio_path):
+        """Decode with the PyAV decoder bundled with faster-whisper"""
+        from faster_whisper import decode_audio
+        return decode_audio(audio_path, sampling_rate=ASR_SAMPLE_RATE)
+
+    def transcribe(self, audio):
+        """Transcribe speech regions found by the Silero VAD filter"""
+        self.load()
+
+        if self.batched_model is not None:
+            segments, _ = self.batched_model.transcribe(
+                audio,
+                batch_size=self.batch_size,
+                vad_filter=True
+            )
+        else:
+            # Older faster-whisper releases only support sequential VAD decoding
+            segments, _ = self.model.transcribe(
+                audio,
+                beam_size=5,
+                vad_filter=True
+            )
+
+        return [
+            {'start': segment.start, 'end': segment.end, 'text': segment.text}
+            for segment in segments
+        ]
+
+# Registry of available speech recognition backends
+ASR_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend
+}
+
+def resolve_backend_name(name):
+    """Resolve 'auto' to the fastest backend available on this host"""
+    if name != "auto":
+        return name
+
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return WhisperBackend.name
+    except ImportError:
+        pass
+
+    try:
+        import faster_whisper
+        return FasterWhisperBackend.name
+    except ImportError:
+        return WhisperBackend.name
+
+def create_asr_backend(name="auto", model_size="base", **kwargs):
+    """Create a speech recognition backend by name"""
+    name = resolve_backend_name(name)
+    if name not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {name}. Available: {', '.join(ASR_BACKENDS)}")
+    return ASR_BACKENDS[name](model_size=model_size, **kwargs)
+
+def find_silence_cuts(audio, chunk_seconds=120.0, search_seconds=10.0, frame_seconds=0.05,
+                      sample_rate=ASR_SAMPLE_RATE):
+    """Return sample positions that split audio into chunks at the quietest nearby frame"""
+    frame_length = int(frame_seconds * sample_rate)
+    num_frames = len(audio) // frame_length
+    if num_frames == 0 or len(audio) <= chunk_seconds * sample_rate:
+        return [0, len(audio)]
+
+    # Frame energy computed in one vectorized pass
+    frames = audio[:num_frames * frame_length].reshape(num_frames, frame_length)
+    energy = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+    frames_per_chunk = int(chunk_seconds / frame_seconds)
+    search_frames = int(search_seconds / frame_seconds)
+
+    cuts = [0]
+    target = frames_per_chunk
+    while target < num_frames - search_frames:
+        lo = max(target - search_frames, cuts[-1] // frame_length + 1)
+        hi = min(target + search_frames, num_frames)
+        quietest = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append(quietest * frame_length + frame_length // 2)
+        target = quietest + frames_per_chunk
+    cuts.append(len(audio))
+    return cuts
+
+# Per-process backend used by chunked transcription workers
+_worker_backend = None
+
+def _init_transcription_worker(backend_name, model_size, cpu_threads):
+    """Load a private model in each worker process"""
+    global _worker_backend
+
+    if backend_name == FasterWhisperBackend.name:
+        _worker_backend = FasterWhisperBackend(model_size, cpu_threads=cpu_threads)
+    else:
+        import torch
+        torch.set_num_threads(cpu_threads)
+        _worker_backend = create_asr_backend(backend_name, model_size)
+    _worker_backend.load()
+
+def _transcribe_window(window):
+    """Transcribe one audio window inside a worker process"""
+    return _worker_backend.transcribe(window)
+
+def merge_chunk_segments(chunk_results, sample_rate=ASR_SAMPLE_RATE):
+    """Offset chunk segments to absolute time and drop duplicates from the overlaps
+
+    chunk_results holds (window_start, core_end, segments) tuples in samples, in order.
+    Each chunk keeps segments centred before its core end, and a later chunk only
+    contributes segments centred after the last segment already kept.
+    """
+    merged = []
+    for window_start, core_end, segments in chunk_results:
+        offset = window_start / sample_rate
+        core_end_s = core_end / sample_rate
+        last_end = merged[-1]['end'] if merged else 0.0
+
+        for segment in segments:
+            start = segment['start'] + offset
+            end = segment['end'] + offset
+            midpoint = (start + end) / 2
+            if last_end <= midpoint < core_end_s:
+                merged.append({'start': max(start, last_end), 'end': end, 'text': segment['text']})
+                last_end = end
+    return merged
+
+def transcribe_chunked(audio_path, backend_name="auto", model_size="base", workers=None,
+                       chunk_seconds=120.0, overlap_seconds=2.0):
+    """Transcribe long audio as overlapping silence-aligned windows in parallel processes"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    backend_name = resolve_backend_name(backend_name)
+    audio = create_asr_backend(backend_name, model_size).load_audio(audio_path)
+
+    cuts = find_silence_cuts(audio, chunk_seconds=chunk_seconds)
+    overlap = int(overlap_seconds * ASR_SAMPLE_RATE)
+    chunks = []
+    for core_start, core_end in zip(cuts, cuts[1:]):
+        window_start = max(0, core_start - overlap)
+        window_end = min(len(audio), core_end + overlap)
+        chunks.append((window_start, window_end, core_start, core_end))
+
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(workers or cpu_count, len(chunks)))
+    cpu_threads = max(1, cpu_count // workers)
+    print(f"Transcribing {len(chunks)} chunks with {workers} workers ({cpu_threads} threads each)")
+
+    # Spawned workers avoid inheriting OpenMP/torch thread state from the parent
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_transcription_worker,
+        initargs=(backend_name, model_size, cpu_threads)
+    ) as executor:
+        windows = [audio[window_start:window_end] for window_start, window_end, _, _ in chunks]
+        results = list(executor.map(_transcribe_window, windows))
+
+    chunk_results = [
+        (window_start, core_end, segments)
+        for (window_start, _, _, core_end), segments in zip(chunks, results)
+    ]
+    return merge_chunk_segments(chunk_results)
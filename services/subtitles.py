@@ -0,0 +1,118 @@
+import re
+from collections import namedtuple
+
+# A subtitle cue with integer millisecond timings
+Cue = namedtuple('Cue', ['start_ms', 'end_ms', 'text'])
+
+# Timestamp in SRT (HH:MM:SS,mmm) or WebVTT (HH:MM:SS.mmm / MM:SS.mmm) form
+_TIMESTAMP_PATTERN = r'(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})'
+_TIMESTAMP_RE = re.compile(r'^\s*' + _TIMESTAMP_PATTERN + r'\s*$')
+_TIMING_LINE_RE = re.compile(r'^\s*' + _TIMESTAMP_PATTERN + r'\s*-->\s*' + _TIMESTAMP_PATTERN)
+
+def _groups_to_ms(hours, minutes, seconds, fraction):
+    """Convert regex timestamp groups to milliseconds"""
+    # Pad fractions such as ',5' to ',500' so they read as milliseconds
+    millis = int(fraction.ljust(3, '0'))
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + millis
+
+def timestamp_to_ms(timestamp):
+    """Convert an SRT or WebVTT timestamp to integer milliseconds"""
+    match = _TIMESTAMP_RE.match(timestamp)
+    if match is None:
+        raise ValueError(f"Invalid timestamp: {timestamp}")
+    return _groups_to_ms(*match.groups())
+
+def seconds_to_ms(seconds):
+    """Convert float seconds to integer milliseconds, truncating like the original SRT writer"""
+    # Whole seconds and the fraction are split first, as int(seconds * 1000) can differ by float error
+    whole = int(seconds)
+    return whole * 1000 + int((seconds - whole) * 1000)
+
+def ms_to_timestamp(ms, separator=','):
+    """Format milliseconds as HH:MM:SS,mmm (or HH:MM:SS.mmm for WebVTT)"""
+    seconds, millis = divmod(int(ms), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+def iter_cues(lines):
+    """Stream cues from an iterable of SRT or WebVTT lines in a single pass"""
+    timing = None
+    text = []
+
+    for line in lines:
+        line = line.strip()
+
+        if not line:
+            # Blank line closes the current cue
+            if timing is not None:
+                yield Cue(timing[0], timing[1], ' '.join(text))
+                timing = None
+                text = []
+            continue
+
+        match = _TIMING_LINE_RE.match(line) if '-->' in line else None
+        if match is not None:
+            # A timing line without a preceding blank line still starts a new cue; a
+            # numeric line before it is the new cue's index unless it is the only text
+            if timing is not None:
+                if len(text) > 1 and text[-1].isdigit():
+                    text.pop()
+                yield Cue(timing[0], timing[1], ' '.join(text))
+                text = []
+            groups = match.groups()
+            timing = (_groups_to_ms(*groups[:4]), _groups_to_ms(*groups[4:]))
+        elif timing is not None:
+            text.append(line)
+        # Counters and WEBVTT headers outside a cue are skipped
+
+    if timing is not None:
+        yield Cue(timing[0], timing[1], ' '.join(text))
+
+def read_subtitles(path):
+    """Read all cues from an SRT or WebVTT file"""
+    with open(path, 'r', encoding='utf-8-sig') as file:
+        return list(iter_cues(file))
+
+def cues_from_segments(segments):
+    """Build cues from speech recognition segments with float second timings"""
+    return [
+        Cue(seconds_to_ms(segment['start']), seconds_to_ms(segment['end']), segment['text'].strip())
+        for segment in segments
+    ]
+
+def cues_to_segments(cues):
+    """Convert cues to the {'start_time', 'end_time', 'text'} dicts used across the pipeline"""
+    return [
+        {'start_time': ms_to_timestamp(cue.start_ms), 'end_time': ms_to_timestamp(cue.end_ms), 'text': cue.text}
+        for cue in cues
+    ]
+
+def cues_to_moviepy(cues):
+    """Convert cues to the ((start, end), text) list accepted by moviepy's SubtitlesClip"""
+    return [((cue.start_ms / 1000, cue.end_ms / 1000), cue.text) for cue in cues]
+
+def write_srt(cues, file):
+    """Write cues as SRT with a single buffered write"""
+    parts = []
+    for index, cue in enumerate(cues, start=1):
+        parts.append(
+            f"{index}\n{ms_to_timestamp(cue.start_ms)} --> {ms_to_timestamp(cue.end_ms)}\n{cue.text}\n\n"
+        )
+    file.write(''.join(parts))
+
+def write_vtt(cues, file):
+    """Write cues as WebVTT with a single buffered write"""
+    parts = ["WEBVTT\n\n"]
+    for cue in cues:
+        parts.append(
+            f"{ms_to_timestamp(cue.start_ms, '.')} --> {ms_to_timestamp(cue.end_ms, '.')}\n{cue.text}\n\n"
+        )
+    file.write(''.join(parts))
+
+def save_subtitles(cues, path):
+    """Save cues to path, choosing SRT or WebVTT from the file extension"""
+    writer = write_vtt if path.lower().endswith('.vtt') else write_srt
+    with open(path, 'w', encoding='utf-8') as file:
+        writer(cues, file)
+    return path
@@ -0,0 +1,164 @@
+import numpy as np
+from services import subtitles
+
+class Track:
+    """Time-sorted intervals stored as parallel integer millisecond arrays"""
+
+    def __init__(self, start_ms=(), end_ms=(), items=()):
+        """Create a track, sorting intervals by start time"""
+        start_ms = np.asarray(start_ms, dtype=np.int64)
+        end_ms = np.asarray(end_ms, dtype=np.int64)
+        items = list(items)
+
+        if len(start_ms) != len(end_ms) or len(start_ms) != len(items):
+            raise ValueError("Track arrays must have the same length")
+
+        order = np.argsort(start_ms, kind='stable')
+        self.start_ms = start_ms[order]
+        self.end_ms = end_ms[order]
+        self.items = [items[i] for i in order]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        """Iterate (start_ms, end_ms, item) tuples"""
+        return zip(self.start_ms.tolist(), self.end_ms.tolist(), self.items)
+
+    @property
+    def duration_ms(self):
+        """Per-interval durations in milliseconds"""
+        return self.end_ms - self.start_ms
+
+    def index_at(self, t_ms):
+        """Return the index of the interval active at t_ms, or -1"""
+        index = int(np.searchsorted(self.start_ms, t_ms, side='right')) - 1
+        if index >= 0 and t_ms < self.end_ms[index]:
+            return index
+        return -1
+
+    def indices_at(self, times_ms):
+        """Vectorized index_at for an array of times (-1 where nothing is active)"""
+        times_ms = np.asarray(times_ms, dtype=np.int64)
+        indices = np.searchsorted(self.start_ms, times_ms, side='right') - 1
+        valid = indices >= 0
+        valid[valid] = times_ms[valid] < self.end_ms[indices[valid]]
+        return np.where(valid, indices, -1)
+
+    def item_at(self, t_ms):
+        """Return the item active at t_ms, or None"""
+        index = self.index_at(t_ms)
+        return self.items[index] if index >= 0 else None
+
+    def shifted(self, offset_ms):
+        """Return a copy with every interval moved by offset_ms"""
+        return Track(self.start_ms + int(offset_ms), self.end_ms + int(offset_ms), self.items)
+
+    def scaled(self, factor, origin_ms=0):
+        """Return a copy with timings stretched by factor around origin_ms"""
+        start = np.rint((self.start_ms - origin_ms) * factor).astype(np.int64) + origin_ms
+        end = np.rint((self.end_ms - origin_ms) * factor).astype(np.int64) + origin_ms
+        return Track(start, end, self.items)
+
+class Timeline:
+    """Subtitle cues, scenes and image slots of one story on a shared millisecond clock"""
+
+    def __init__(self, cues=None, scenes=None, image_slots=None, duration_ms=None):
+        """Create a timeline from tracks"""
+        self.cues = cues if cues is not None else Track()
+        self.scenes = scenes if scenes is not None else Track()
+        self.image_slots = image_slots if image_slots is not None else Track()
+        self._duration_ms = duration_ms
+
+    @property
+    def duration_ms(self):
+        """Explicit duration, or the end of the last interval on any track"""
+        if self._duration_ms is not None:
+            return self._duration_ms
+        ends = [int(track.end_ms.max()) for track in (self.cues, self.scenes, self.image_slots) if len(track)]
+        return max(ends) if ends else 0
+
+    @classmethod
+    def from_cues(cls, cues, duration_ms=None):
+        """Build a timeline from subtitles.Cue objects"""
+        return cls(
+            cues=Track([cue.start_ms for cue in cues], [cue.end_ms for cue in cues], [cue.text for cue in cues]),
+            duration_ms=duration_ms
+        )
+
+    @classmethod
+    def from_srt(cls, srt_path, duration_ms=None):
+        """Build a timeline from an SRT or WebVTT file"""
+        return cls.from_cues(subtitles.read_subtitles(srt_path), duration_ms)
+
+    @staticmethod
+    def _track_from_timed(entries, start_key, end_key):
+        """Build a track from dicts carrying HH:MM:SS,mmm timestamps"""
+        return Track(
+            [subtitles.timestamp_to_ms(entry[start_key]) for entry in entries],
+            [subtitles.timestamp_to_ms(entry[end_key]) for entry in entries],
+            entries
+        )
+
+    def with_scenes(self, scene_descriptions):
+        """Return a timeline whose scene track holds the scene description dicts"""
+        scenes = self._track_from_timed(scene_descriptions, 'start_time', 'end_time')
+        return Timeline(self.cues, scenes, self.image_slots, self._duration_ms)
+
+    @staticmethod
+    def _slot_ms(prompt, position, fallback_ms):
+        """One timing bound of an image prompt in ms, or fallback_ms when it cannot be read"""
+        try:
+            return subtitles.timestamp_to_ms(prompt['timing'][position])
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            print(f"Error reading image timing: {str(e)}")
+            return fallback_ms
+
+    def with_image_slots(self, image_prompts, image_paths=None):
+        """Return a timeline whose image track holds (prompt dict, image path) pairs
+
+        A slot whose start cannot be read starts with the previous slot (or at 0); one
+        whose end cannot be read ends at its start.
+        """
+        if image_paths is None:
+            image_paths = [None] * len(image_prompts)
+        pairs = list(zip(image_prompts, image_paths))
+        start_ms, end_ms = [], []
+        for prompt, _ in pairs:
+            start = self._slot_ms(prompt, 0, start_ms[-1] if start_ms else 0)
+            start_ms.append(start)
+            end_ms.append(self._slot_ms(prompt, 1, start))
+        image_slots = Track(start_ms, end_ms, pairs)
+        return Timeline(self.cues, self.scenes, image_slots, self._duration_ms)
+
+    def active_at(self, t_ms):
+        """Return the cue text, scene and image slot active at t_ms"""
+        return {
+            'cue': self.cues.item_at(t_ms),
+            'scene': self.scenes.item_at(t_ms),
+            'image': self.image_slots.item_at(t_ms)
+        }
+
+    def shifted(self, offset_ms):
+        """Return a copy with every track moved by offset_ms"""
+        duration = None if self._duration_ms is None else self._duration_ms + int(offset_ms)
+        return Timeline(
+            self.cues.shifted(offset_ms),
+            self.scenes.shifted(offset_ms),
+            self.image_slots.shifted(offset_ms),
+            duration
+        )
+
+    def scaled(self, factor):
+        """Return a copy with every track stretched by factor (e.g. after a tempo change)"""
+        duration = None if self._duration_ms is None else int(round(self._duration_ms * factor))
+        return Timeline(
+            self.cues.scaled(factor),
+            self.scenes.scaled(factor),
+            self.image_slots.scaled(factor),
+            duration
+        )
+
+    def subtitle_cues(self):
+        """Return the cue track as subtitles.Cue objects"""
+        return [subtitles.Cue(start, end, text) for start, end, text in self.cues]
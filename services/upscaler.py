@@ -0,0 +1,64 @@
+import os
+import glob
+import time
+from PIL import Image, ImageFilter
+
+# Video render resolution
+RENDER_SIZE = (1920, 1080)
+
+# Native resolution of low-resolution generation, same 3:2 framing as 1024x680
+LOW_RES_SIZE = (768, 512)
+
+def cover_size(size, target=RENDER_SIZE):
+    """Smallest size with the image's aspect ratio that covers target, as VideoService computes it"""
+    aspect = size[0] / size[1]
+    target_width, target_height = target
+    if aspect > target_width / target_height:
+        return int(target_height * aspect), target_height
+    return target_width, int(target_width / aspect)
+
+def upscale_to_cover(image, target=RENDER_SIZE, sharpen=True):
+    """Resize image once to its cover size for target with Lanczos and a light unsharp mask
+
+    Always returns a new, fully loaded RGB image, even when no resize is needed.
+    """
+    size = cover_size(image.size, target)
+    if image.size == size:
+        return image.convert("RGB")
+    upscaled = image.convert("RGB").resize(size, Image.LANCZOS)
+    if sharpen:
+        upscaled = upscaled.filter(ImageFilter.UnsharpMask(radius=1.5, percent=60, threshold=2))
+    return upscaled
+
+def upscale_files(image_paths, output_dir="output/images/render", target=RENDER_SIZE, sharpen=True):
+    """Upscale image files to cover target, writing PNGs under output_dir
+
+    output_dir is cleared of earlier renders first.
+
+    Returns (output paths, timings), with None kept for missing images, where timings holds the seconds spent resizing and
+    writing.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Renders of an earlier run or project are replaced, never accumulated
+    for stale_path in glob.glob(os.path.join(output_dir, "*.png")):
+        os.remove(stale_path)
+
+    timings = {'images': 0, 'resize_seconds': 0.0, 'write_seconds': 0.0}
+    output_paths = []
+    for path in image_paths:
+        # Missing scenes keep their empty slot
+        if path is None:
+            output_paths.append(None)
+            continue
+        start = time.perf_counter()
+        with Image.open(path) as image:
+            upscaled = upscale_to_cover(image, target, sharpen)
+        resized = time.perf_counter()
+        output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + ".png")
+        upscaled.save(output_path, format="PNG", compress_level=1)
+        timings['resize_seconds'] += resized - start
+        timings['write_seconds'] += time.perf_counter() - resized
+        timings['images'] += 1
+        output_paths.append(output_path)
+    return output_paths, timings
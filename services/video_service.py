@@ -3,6 +3,12 @@ import random
 import numpy as np
 from moviepy.editor import *
 import traceback
+from moviepy.video.tools.subtitles import SubtitlesClip
+from services import subtitles
+from services.timeline import Timeline
+from services.mastering import AudioMaster
+from services.audio_io import audio_duration
+from services.file_utils import safe_slug
 
 class VideoService:
     """Service for video generation and processing"""
@@ -15,8 +21,7 @@ class VideoService:
     def convert_timestamp_to_seconds(self, timestamp):
         """Convert SRT timestamp to seconds"""
         try:
-            hours, minutes, seconds = timestamp.replace(',', '.').split(':')
-            return float(hours) * 3600 + float(minutes) * 60 + float(seconds)
+            return subtitles.timestamp_to_ms(timestamp) / 1000
         except Exception as e:
             print(f"Error converting timestamp {timestamp}: {str(e)}")
             return 0.0
@@ -26,8 +31,14 @@ class VideoService:
         return 10 ** (db / 20)
     
     def create_video(self, image_prompts, image_paths, audio_path, title, srt_path=None, ambient_path=None, 
-                    video_quality="4000k", cinematic_ratio=16/9, use_dust_overlay=True):
-        """Create cinematic video with user-selected preferences"""
+                    video_quality="4000k", cinematic_ratio=16/9, use_dust_overlay=True, timeline=None,
+                    music_path=None):
+        """Create cinematic video with user-selected preferences
+        
+        An optional Timeline supplies cue and image slot timings directly; image slots
+        are built from the prompts' 'timing' tuples when it has none. Narration, ambient
+        and music are mastered into one ducked, loudness-normalized track.
+        """
         try:
             print("Starting enhanced cinematic video creation...")
             
@@ -46,34 +57,40 @@ class VideoService:
             valid_image_paths = []
             valid_prompts = []
             for i, (prompt, path) in enumerate(zip(image_prompts, image_paths)):
-                if os.path.exists(path):
+                if path and os.path.exists(path):
                     valid_image_paths.append(path)
                     valid_prompts.append(prompt)
                 else:
-                    print(f"Warning: Image file not found: {path}")
+                    print(f"Warning: No image for scene {i + 1}: {path}")
             
             if not valid_image_paths:
                 raise ValueError("No valid image files found")
             
-            # Get audio duration
+            # Get audio duration from the file header
             try:
-                audio = AudioFileClip(audio_path)
-                total_duration = audio.duration
+                total_duration = audio_duration(audio_path)
                 print(f"Audio duration: {total_duration:.2f} seconds")
             except Exception as e:
                 print(f"Error loading audio: {str(e)}")
                 raise
             
+            # Image slot timings come from the shared timeline
+            if timeline is None:
+                timeline = Timeline()
+            if len(timeline.image_slots) == 0:
+                timeline = timeline.with_image_slots(valid_prompts, valid_image_paths)
+            image_slots = timeline.image_slots
+            start_times = image_slots.start_ms / 1000
+            durations = np.maximum(image_slots.duration_ms / 1000, 1.0)  # Ensure minimum duration
+            
             # Create clips from images with their specific timings and fill screen
             video_clips = []
             
-            print(f"Processing {len(valid_image_paths)} images...")
-            for i, (prompt_data, img_path) in enumerate(zip(valid_prompts, valid_image_paths)):
+            print(f"Processing {len(image_slots)} images...")
+            for i, (_, _, (prompt_data, img_path)) in enumerate(image_slots):
                 try:
-                    # Get timing from prompt data
-                    start_time = self.convert_timestamp_to_seconds(prompt_data['timing'][0])
-                    end_time = self.convert_timestamp_to_seconds(prompt_data['timing'][1])
-                    duration = max(end_time - start_time, 1.0)  # Ensure minimum duration
+                    start_time = float(start_times[i])
+                    duration = float(durations[i])
                     
                     # Add random subtle tilt/rotation to image
                     tilt_angle = random.uniform(-2.0, 2.0)  # Random tilt between -2 and 2 degrees
@@ -97,8 +114,9 @@ class VideoService:
                         new_width = target_width
                         new_height = int(new_width / img_aspect)
                     
-                    # Resize to fill screen
-                    img = img.resize(width=new_width, height=new_height)
+                    # Resize to fill screen, unless the image was already upscaled to cover it
+                    if (img.w, img.h) != (new_width, new_height):
+                        img = img.resize(width=new_width, height=new_height)
                     
                     clip = (img
                        .set_duration(duration)
@@ -108,7 +126,7 @@ class VideoService:
                        .set_position('center'))  # Ensure image is centered
                     
                     video_clips.append(clip)
-                    print(f"Processed image {i+1}/{len(valid_image_paths)}")
+                    print(f"Processed image {i+1}/{len(image_slots)}")
                 except Exception as e:
                     print(f"Error processing image {i+1}: {str(e)}")
                     # Continue with next image
@@ -145,9 +163,9 @@ class VideoService:
             
             # Add subtitles if available
             subtitle_clip = None
-            if srt_path and os.path.exists(srt_path):
+            if len(timeline.cues) > 0 or (srt_path and os.path.exists(srt_path)):
                 try:
-                    print("Adding subtitles from: " + srt_path)
+                    print("Adding subtitles from: " + (srt_path or "timeline"))
                     
                     # First try to use a better font for subtitles
                     subtitle_font = 'Arial-Bold'  # Default fallback
@@ -177,8 +195,12 @@ class VideoService:
                         align='center'
                     )
                     
-                    # Create the subtitles clip
-                    subtitle_clip = SubtitlesClip(srt_path, generator)
+                    # Create the subtitles clip from timeline cues or the shared parser
+                    if len(timeline.cues) > 0:
+                        cues = timeline.subtitle_cues()
+                    else:
+                        cues = subtitles.read_subtitles(srt_path)
+                    subtitle_clip = SubtitlesClip(subtitles.cues_to_moviepy(cues), generator)
                     
                     # Set the position to bottom center with padding
                     subtitle_clip = subtitle_clip.set_position(('center', 0.85), relative=True)
@@ -214,26 +236,20 @@ class VideoService:
             except Exception as e:
                 print(f"Error in final composition: {str(e)}")
             
-            # Add ambient soundscape if available
-            if ambient_path and os.path.exists(ambient_path):
-                try:
-                    print("Adding ambient sound design...")
-                    ambient_audio = AudioFileClip(ambient_path)
-                    
-                    # Ensure ambient audio matches narration duration
-                    if ambient_audio.duration < total_duration:
-                        ambient_audio = afx.audio_loop(ambient_audio, duration=total_duration)
-                    else:
-                        ambient_audio = ambient_audio.subclip(0, total_duration)
-                    
-                    # Mix ambient sounds with narration (ambient at lower volume)
-                    ambient_audio = ambient_audio.volumex(self.db_to_amplitude(-15))  # Lower volume for ambient
-                    final_audio = CompositeAudioClip([audio, ambient_audio])
-                except Exception as e:
-                    print(f"Warning: Could not add ambient sound: {str(e)}")
-                    final_audio = audio
-            else:
-                final_audio = audio
+            # Master narration with ducked ambient and music beds into one track
+            try:
+                print("Mastering final audio mix...")
+                # Story titles can hold path separators and other unsafe characters
+                master_path = AudioMaster().master(
+                    audio_path,
+                    os.path.join("output/audio", f"{safe_slug(title)}_master.wav"),
+                    ambient_path=ambient_path,
+                    music_path=music_path
+                )
+                final_audio = AudioFileClip(master_path)
+            except Exception as e:
+                print(f"Warning: Could not master audio: {str(e)}")
+                final_audio = AudioFileClip(audio_path)
 
             # Set audio to video
             try:
@@ -287,7 +303,7 @@ class VideoService:
             # Cleanup
             try:
                 video.close()
-                audio.close()
+                final_audio.close()
                 if subtitle_clip is not None:
                     subtitle_clip.close()
                 
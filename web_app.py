@@ -4,6 +4,7 @@ import sys
 import uuid
 import threading
 import json
+import shutil
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 
@@ -20,7 +21,8 @@ generation_status = {
     'message': '',
     'level': 'info',
     'images': [],
-    'video': None
+    'video': None,
+    'podcast': None
 }
 
 # Background thread for generation
@@ -37,6 +39,7 @@ def ensure_directories():
         "output/audio",
         "output/images",
         "output/videos",
+        "output/podcast",
         "output/subtitles",
         "temp"
     ]
@@ -66,6 +69,8 @@ try:
         
         <div class="main-controls">
             <button id="generate-btn" class="primary-btn">Generate Horror Video</button>
+            <label><input type="checkbox" id="low-res-images"> Low-res images + upscale (faster)</label>
+            <label><input type="checkbox" id="audio-only"> Audio only (podcast episode)</label>
         </div>
         
         <div id="status-container">
@@ -94,6 +99,12 @@ try:
                 <a id="download-link" class="download-btn">Download Video</a>
             </div>
         </div>
+        
+        <div id="podcast-container" style="display:none;">
+            <h2>Your Podcast Episode</h2>
+            <audio id="podcast-player" controls style="width:100%"></audio>
+            <div id="podcast-links" class="download-container"></div>
+        </div>
     </div>
     
     <script src="/static/js/app.js"></script>
@@ -331,6 +342,7 @@ async function startGeneration() {
     // Reset UI
     document.getElementById('image-preview').style.display = 'none';
     document.getElementById('video-container').style.display = 'none';
+    document.getElementById('podcast-container').style.display = 'none';
     document.getElementById('image-grid').innerHTML = '';
     document.getElementById('progress-bar').style.width = '0%';
     document.getElementById('progress-text').textContent = '0%';
@@ -341,7 +353,12 @@ async function startGeneration() {
     try {
         // Call the API to start the generation process
         const response = await fetch('/api/generate', {
-            method: 'POST'
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({
+                low_res_images: document.getElementById('low-res-images').checked,
+                audio_only: document.getElementById('audio-only').checked
+            })
         });
         
         if (!response.ok) {
@@ -397,6 +414,20 @@ function startPolling() {
                 isGenerating = false;
             }
             
+            // Update podcast episode if available
+            if (data.podcast) {
+                displayPodcast(data.podcast);
+                
+                addLogEntry('Podcast episode complete!', 'success');
+                updateProgress(100);
+                
+                clearInterval(pollInterval);
+                
+                document.getElementById('generate-btn').disabled = false;
+                document.getElementById('generate-btn').textContent = 'Generate Horror Video';
+                isGenerating = false;
+            }
+            
             // Check for completion or error
             if (data.status === 'error') {
                 addLogEntry('Error: ' + data.message, 'error');
@@ -445,6 +476,25 @@ function displayVideo(videoUrl) {
     document.getElementById('video-container').style.display = 'block';
 }
 
+// Display the podcast episode with one download link per format
+function displayPodcast(files) {
+    const formats = Object.keys(files);
+    document.getElementById('podcast-player').src = files['mp3'] || files[formats[0]];
+    
+    const links = document.getElementById('podcast-links');
+    links.innerHTML = '';
+    formats.forEach(format => {
+        const link = document.createElement('a');
+        link.className = 'download-btn';
+        link.href = files[format];
+        link.download = files[format].split('/').pop();
+        link.textContent = 'Download ' + format.toUpperCase();
+        links.appendChild(link);
+    });
+    
+    document.getElementById('podcast-container').style.display = 'block';
+}
+
 // Add a log entry to the terminal
 function addLogEntry(message, type = 'info') {
     const terminal = document.getElementById('terminal-content');
@@ -478,8 +528,9 @@ except Exception as e:
     sys.exit(1)
 
 # Function to run the generation process
-def run_generation():
+def run_generation(options=None):
     global generation_status
+    options = options or {}
     
     try:
         # Update status
@@ -507,13 +558,17 @@ def run_generation():
                     generation_status['images'] = image_urls
             
             # Run the complete pipeline from prototype.py
-            results = prototype.run_complete_pipeline()
+            results = prototype.run_complete_pipeline(
+                audio_only=bool(options.get('audio_only', False)),
+                low_res_images=bool(options.get('low_res_images', False))
+            )
             
             if results:
                 # Update status with results
                 generation_status['status'] = 'completed'
                 generation_status['progress'] = 100
-                generation_status['message'] = 'Horror video generation complete!'
+                generation_status['message'] = ('Podcast episode complete!' if results.get('podcast')
+                                                else 'Horror video generation complete!')
                 generation_status['level'] = 'success'
                 
                 # Set image paths
@@ -524,6 +579,14 @@ def run_generation():
                 # Set video path
                 if 'video_path' in results and results['video_path']:
                     generation_status['video'] = f'/output/videos/{os.path.basename(results["video_path"])}'
+                
+                # Copy podcast files where /output serves them
+                if results.get('podcast'):
+                    podcast_urls = {}
+                    for output_format, file_path in results['podcast']['files'].items():
+                        shutil.copy2(file_path, os.path.join("output/podcast", os.path.basename(file_path)))
+                        podcast_urls[output_format] = f'/output/podcast/{os.path.basename(file_path)}'
+                    generation_status['podcast'] = podcast_urls
             else:
                 # Update status with error
                 generation_status['status'] = 'error'
@@ -566,6 +629,9 @@ def generate():
     if generation_status['status'] == 'running':
         return jsonify({'success': False, 'message': 'Generation already in progress'}), 400
     
+    # Optional pipeline settings sent as JSON
+    options = request.get_json(silent=True) or {}
+    
     # Reset status
     generation_status = {
         'status': 'running',
@@ -573,11 +639,12 @@ def generate():
         'message': 'Starting generation process...',
         'level': 'info',
         'images': [],
-        'video': None
+        'video': None,
+        'podcast': None
     }
     
     # Start generation in background thread
-    generation_thread = threading.Thread(target=run_generation)
+    generation_thread = threading.Thread(target=run_generation, args=(options,))
     generation_thread.daemon = True
     generation_thread.start()
     